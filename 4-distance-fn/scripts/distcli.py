@@ -1,11 +1,57 @@
 from __future__ import annotations
 
 import argparse
+import sys
 
+import numpy as np
+
+from distances.corpus import query_corpus
 from distances.metrics import cosine_distance, chebyshev_distance, hamming_distance
+from distances.pairwise import pairwise_distances, paired_distances
+from distances.io import DEFAULT_CHUNK_SIZE, iter_vector_chunks, write_values
 from distances.utils import parse_csv_vector
 
 
+def run_bulk(args: argparse.Namespace) -> None:
+    """
+    Bulk mode: stream distances for many vectors, one value per line.
+    - --pairs: each row is [a | b] (CSV with 2*d values, or .npy of shape (n, 2, d))
+    - --corpus with --a or --queries: distance from each query to every corpus
+      row; text output has one line per corpus row, one column per query
+    - a .npy --corpus with a .npy --output is scanned block by block
+      (memory-mapped) and written to a memory-mapped (n_queries, n_corpus) file
+    """
+    if args.corpus is not None:
+        if args.queries is not None:
+            queries = np.vstack(list(iter_vector_chunks(args.queries)))
+        else:
+            queries = parse_csv_vector(args.a)
+        if args.output is not None and args.output.endswith(".npy"):
+            if not args.corpus.endswith(".npy"):
+                raise ValueError("A .npy --output requires a .npy --corpus")
+            query_corpus(queries, args.corpus, metric=args.metric,
+                         block_size=args.chunk_size, out=args.output)
+            return
+
+    out = sys.stdout if args.output in (None, "-") else open(args.output, "w")
+    try:
+        if args.pairs is not None:
+            for chunk in iter_vector_chunks(args.pairs, args.chunk_size):
+                if chunk.shape[1] % 2 != 0:
+                    raise ValueError(
+                        "Each pairs row must hold two vectors of equal length")
+                d = chunk.shape[1] // 2
+                write_values(out, paired_distances(
+                    chunk[:, :d], chunk[:, d:], metric=args.metric))
+        else:
+            for chunk in iter_vector_chunks(args.corpus, args.chunk_size):
+                D = pairwise_distances(queries, chunk, metric=args.metric)
+                write_values(out, D[0] if queries.ndim == 1 else D.T)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Compute distances between two vectors (comma-separated)."
@@ -13,8 +59,19 @@ def main() -> int:
     sub = parser.add_subparsers(dest="metric", required=True)
 
     def add_common_args(p: argparse.ArgumentParser) -> None:
-        p.add_argument("--a", required=True, help='Vector a, e.g. "1,2,3"')
-        p.add_argument("--b", required=True, help='Vector b, e.g. "4,5,6"')
+        p.add_argument("--a", help='Vector a, e.g. "1,2,3"')
+        p.add_argument("--b", help='Vector b, e.g. "4,5,6"')
+        bulk = p.add_mutually_exclusive_group()
+        bulk.add_argument(
+            "--pairs", help='Bulk: CSV/.npy of vector pairs per row, "-" for stdin')
+        bulk.add_argument(
+            "--corpus", help='Bulk: CSV/.npy corpus compared against --a/--queries, "-" for stdin')
+        p.add_argument(
+            "--queries", help="Bulk: CSV/.npy of query vectors for --corpus")
+        p.add_argument(
+            "--output", help="Bulk: output file (default: stdout); .npy is memory-mapped")
+        p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                       help="Bulk: rows read per chunk")
 
     p_cos = sub.add_parser("cosine", help="Cosine distance")
     add_common_args(p_cos)
@@ -29,6 +86,19 @@ def main() -> int:
 
     args = parser.parse_args()
 
+    if args.pairs is not None:
+        if args.a is not None or args.b is not None:
+            parser.error("--pairs does not take --a/--b")
+        run_bulk(args)
+        return 0
+    if args.corpus is not None:
+        if (args.a is None) == (args.queries is None) or args.b is not None:
+            parser.error("--corpus requires exactly one of --a / --queries, and no --b")
+        run_bulk(args)
+        return 0
+    if args.a is None or args.b is None:
+        parser.error("--a and --b are required")
+
     a = parse_csv_vector(args.a)
     b = parse_csv_vector(args.b)
 
@@ -1,3 +1,18 @@
 from .metrics import cosine_distance, chebyshev_distance, hamming_distance
+from .pairwise import pairwise_distances, paired_distances
+from .corpus import query_corpus
+from .search import topk
+from .index import CosineIndex
+from .parallel import parallel_pairwise_distances
 
-__all__ = ["cosine_distance", "chebyshev_distance", "hamming_distance"]
+__all__ = [
+    "cosine_distance",
+    "chebyshev_distance",
+    "hamming_distance",
+    "pairwise_distances",
+    "paired_distances",
+    "query_corpus",
+    "topk",
+    "CosineIndex",
+    "parallel_pairwise_distances",
+]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from .pairwise import DEFAULT_WORKING_MEMORY, block_rows, iter_blocks
+from .utils import ArrayLike
+
+
+@dataclass(frozen=True)
+class PackedVectors:
+    """
+    Bit-packed rows: each row is stored as `words` (uint64), 64 features per word.
+
+    bits_per_mismatch is 1 for binary vectors and 2 for one-hot encoded
+    categorical vectors (a different category flips two bits).
+    """
+    words: np.ndarray
+    n_features: int
+    bits_per_mismatch: int = 1
+
+    def __len__(self) -> int:
+        return self.words.shape[0]
+
+
+def _as_2d(x: ArrayLike, *, name: str) -> np.ndarray:
+    arr = np.asarray(x)
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    if arr.ndim != 2:
+        raise ValueError(f"{name} must be a 2D matrix. Got shape={arr.shape}")
+    return arr
+
+
+def _pack_bool(bits: np.ndarray) -> np.ndarray:
+    """
+    Pack a 2D bool matrix into uint64 words (zero-padded to a multiple of 64 bits).
+    """
+    packed = np.packbits(bits, axis=1)
+    n_bytes = -(-packed.shape[1] // 8) * 8
+    if n_bytes != packed.shape[1]:
+        packed = np.pad(packed, ((0, 0), (0, n_bytes - packed.shape[1])))
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+
+def pack_binary(X: ArrayLike) -> PackedVectors:
+    """
+    Pack binary vectors (values in {0, 1} or bool), one per row.
+    """
+    arr = _as_2d(X, name="X")
+    if arr.dtype != bool:
+        if not np.isin(arr, (0, 1)).all():
+            raise ValueError("Binary vectors must only contain 0/1 values")
+        arr = arr.astype(bool)
+    return PackedVectors(_pack_bool(arr), n_features=arr.shape[1])
+
+
+def pack_categorical(
+    X: ArrayLike,
+    categories: Optional[Sequence[np.ndarray]] = None,
+) -> Tuple[PackedVectors, List[np.ndarray]]:
+    """
+    Pack categorical vectors with an equality-bitmask (one-hot) encoding.
+
+    categories: sorted categories per feature. When None they are learned from X;
+    pass the returned categories when packing the vectors you compare against.
+    Returns (packed, categories).
+    """
+    arr = _as_2d(X, name="X")
+    if categories is None:
+        categories = [np.unique(arr[:, j]) for j in range(arr.shape[1])]
+    if len(categories) != arr.shape[1]:
+        raise ValueError(
+            f"Expected categories for {arr.shape[1]} features. Got {len(categories)}")
+
+    sizes = [len(c) for c in categories]
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    bits = np.zeros((arr.shape[0], int(offsets[-1])), dtype=bool)
+    rows = np.arange(arr.shape[0])
+    for j, cats in enumerate(categories):
+        if len(cats) == 0:
+            raise ValueError(f"No categories given for feature {j}")
+        pos = np.minimum(np.searchsorted(cats, arr[:, j]), len(cats) - 1)
+        if not (cats[pos] == arr[:, j]).all():
+            raise ValueError(f"Unknown category in feature {j}")
+        bits[rows, offsets[j] + pos] = True
+
+    packed = PackedVectors(_pack_bool(bits), n_features=arr.shape[1],
+                           bits_per_mismatch=2)
+    return packed, list(categories)
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(words: np.ndarray) -> np.ndarray:
+        """Number of set bits per element."""
+        return np.bitwise_count(words)
+else:  # NumPy < 2.0: byte lookup table
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)],
+                               dtype=np.uint8)
+
+    def popcount(words: np.ndarray) -> np.ndarray:
+        """Number of set bits per element."""
+        as_bytes = words.view(np.uint8).reshape(*words.shape, words.itemsize)
+        return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def hamming_packed(
+    A: PackedVectors,
+    B: Optional[PackedVectors] = None,
+    *,
+    working_memory: int = DEFAULT_WORKING_MEMORY,
+) -> np.ndarray:
+    """
+    Hamming distance (# of mismatching features) between every packed row
+    of A and every packed row of B (B defaults to A). Returns an int64
+    (len(A), len(B)) matrix; for one-vs-many pass a single packed query row.
+    """
+    B = A if B is None else B
+    if (A.n_features, A.bits_per_mismatch) != (B.n_features, B.bits_per_mismatch):
+        raise ValueError("A and B must be packed with the same encoding and width")
+
+    WA, WB = A.words, B.words
+    out = np.empty((WA.shape[0], WB.shape[0]), dtype=np.int64)
+    rows = block_rows(WB.shape[0], WA.shape[1], broadcast=True,
+                      working_memory=working_memory)
+    for sl in iter_blocks(WA.shape[0], rows):
+        xor = WA[sl, None, :] ^ WB[None, :, :]
+        out[sl] = popcount(xor).sum(axis=2, dtype=np.int64)
+
+    if A.bits_per_mismatch != 1:
+        out //= A.bits_per_mismatch
+    return out
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+from .pairwise import pairwise_distances, iter_blocks, result_dtype
+from .utils import ArrayLike, Precision, resolve_dtype
+
+DEFAULT_BLOCK_SIZE = 65536  # corpus rows per block
+
+Corpus = Union[str, np.ndarray]
+
+
+def open_corpus(corpus: Corpus) -> np.ndarray:
+    """
+    Open a corpus of vectors (one per row). A path to a .npy file is
+    memory-mapped read-only, so it is never loaded into RAM as a whole.
+    """
+    arr = np.load(corpus, mmap_mode="r") if isinstance(corpus, str) else np.asarray(corpus)
+    if arr.ndim != 2:
+        raise ValueError(f"corpus must be a 2D matrix. Got shape={arr.shape}")
+    return arr
+
+
+def iter_corpus_blocks(
+    corpus: Corpus,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[Tuple[slice, np.ndarray]]:
+    """
+    Yield (rows, block) pairs scanning the corpus in fixed-size blocks.
+    """
+    if block_size < 1:
+        raise ValueError("block_size must be >= 1")
+    arr = open_corpus(corpus)
+    for sl in iter_blocks(arr.shape[0], block_size):
+        yield sl, np.asarray(arr[sl])
+
+
+def query_corpus(
+    queries: ArrayLike,
+    corpus: Corpus,
+    metric: str = "cosine",
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    out: Optional[str] = None,
+    precision: Precision = "float64",
+) -> np.ndarray:
+    """
+    Distances from one or more query vectors to every corpus row.
+
+    The corpus (array or .npy path) is scanned block by block, so only one block
+    of rows is resident at a time. Returns a 1D array for a single 1D query,
+    else a (n_queries, n_corpus) matrix. With `out` (a .npy path) the result
+    is written into a memory-mapped file and that memmap is returned.
+    With precision="native" a float32/float16 corpus is read in its own dtype.
+    """
+    single = np.ndim(queries) == 1
+    Q = np.asarray(queries)
+    if single:
+        Q = Q.reshape(1, -1)
+
+    arr = open_corpus(corpus)
+    if Q.ndim != 2 or Q.shape[1] != arr.shape[1]:
+        raise ValueError(
+            f"queries must have {arr.shape[1]} features. Got shape={Q.shape}")
+
+    shape = (Q.shape[0], arr.shape[0])
+    dtype = result_dtype(metric, resolve_dtype(Q, precision),
+                         resolve_dtype(arr, precision))
+    if out is not None:
+        result = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=shape)
+    else:
+        result = np.empty(shape, dtype=dtype)
+
+    for sl, block in iter_corpus_blocks(arr, block_size):
+        result[:, sl] = pairwise_distances(Q, block, metric=metric,
+                                           precision=precision)
+
+    if out is not None:
+        result.flush()
+    return result[0] if single else result
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+from .corpus import DEFAULT_BLOCK_SIZE
+from .pairwise import iter_blocks
+from .search import select_topk, select_topk_block
+from .utils import to_2d_float_array, ArrayLike, Precision
+
+
+def _row_norms(X: np.ndarray) -> np.ndarray:
+    """
+    float64 L2 norm of every row.
+    """
+    return np.linalg.norm(X.astype(np.float64, copy=False), axis=1)
+
+
+class CosineIndex:
+    """
+    Corpus with norms cached once for repeated cosine queries.
+
+    Norms and zero-vector flags are cached at build time, so a query is a single
+    matrix product against the corpus, divided by the cached norms. Zero-vector
+    behavior matches cosine_distance:
+    - if both are zero vectors -> distance = 0.0
+    - if only one is zero -> distance = 1.0
+    Values agree with cosine_distance up to floating-point rounding.
+
+    precision="native" stores a float32/float16 corpus as is, in its own dtype;
+    products and norms are still computed in float64 (one block at a time), so
+    distances agree with precision="float64" on the same stored values to
+    float64 rounding, as documented in distances.utils.
+    """
+
+    def __init__(self, corpus: ArrayLike, *, precision: Precision = "float64"):
+        self.corpus_ = to_2d_float_array(corpus, name="corpus", precision=precision)
+        self.norms_ = _row_norms(self.corpus_)
+        self.zero_ = self.norms_ == 0.0
+
+    def __len__(self) -> int:
+        return self.corpus_.shape[0]
+
+    def _prepare(self, queries: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+        Q = to_2d_float_array(queries, name="queries")
+        if Q.shape[1] != self.corpus_.shape[1]:
+            raise ValueError(
+                f"queries must have {self.corpus_.shape[1]} features. Got shape={Q.shape}")
+        return Q, _row_norms(Q)
+
+    def _block(self, Q: np.ndarray, qn: np.ndarray, rows: slice) -> np.ndarray:
+        C = self.corpus_[rows].astype(np.float64, copy=False)
+        cn = self.norms_[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cos_sim = (Q @ C.T) / np.outer(qn, cn)
+        D = 1.0 - np.clip(cos_sim, -1.0, 1.0)
+        q_zero = qn == 0.0
+        c_zero = self.zero_[rows]
+        D[q_zero, :] = 1.0
+        D[:, c_zero] = 1.0
+        D[np.ix_(q_zero, c_zero)] = 0.0
+        return D
+
+    def distances(self, queries: ArrayLike) -> np.ndarray:
+        """
+        Cosine distance from each query to every corpus row.
+        Returns 1D for a single 1D query, else (n_queries, n_corpus).
+        """
+        Q, qn = self._prepare(queries)
+        D = self._block(Q, qn, slice(None))
+        return D[0] if np.ndim(queries) == 1 else D
+
+    def topk(
+        self,
+        queries: ArrayLike,
+        k: int,
+        *,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest corpus rows per query, ordered by (distance, index).
+        Distances near the k-th are re-scored like distances.search.topk, so
+        the result matches topk on the same corpus for any block_size.
+        Returns (indices, distances): 1D for a single 1D query, else (n_queries, k).
+        """
+        if k < 1:
+            raise ValueError("k must be >= 1")
+        Q, qn = self._prepare(queries)
+        best_i = np.empty((Q.shape[0], 0), dtype=np.int64)
+        best_d = np.empty((Q.shape[0], 0), dtype=float)
+
+        for sl in iter_blocks(len(self), block_size):
+            D = self._block(Q, qn, sl)
+            block_i, block_d = select_topk_block(
+                D, sl.start, k, Q, self.corpus_[sl], "cosine")
+            best_i, best_d = select_topk(
+                np.hstack([best_d, block_d]), np.hstack([best_i, block_i]), k)
+
+        if np.ndim(queries) == 1:
+            return best_i[0], best_d[0]
+        return best_i, best_d
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import itertools
+import sys
+from typing import Iterator, TextIO
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 65536  # rows
+
+
+def _parse_csv_lines(lines: list[str], *, source: str) -> np.ndarray:
+    try:
+        arr = np.loadtxt(lines, delimiter=",", dtype=float, ndmin=2)
+    except ValueError as e:
+        raise ValueError(f"Invalid number in {source}") from e
+    return arr
+
+
+def iter_vector_chunks(
+    path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[np.ndarray]:
+    """
+    Yield 2D float chunks of at most chunk_size rows (one vector per row) from:
+    - a .npy file (memory-mapped, never fully loaded; trailing dims are flattened)
+    - a CSV file (comma-separated, one vector per line)
+    - "-" for CSV on stdin
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    if path.endswith(".npy"):
+        arr = np.load(path, mmap_mode="r")
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+        elif arr.ndim > 2:
+            arr = arr.reshape(arr.shape[0], -1)
+        for start in range(0, arr.shape[0], chunk_size):
+            yield np.asarray(arr[start:start + chunk_size], dtype=float)
+        return
+
+    fh: TextIO = sys.stdin if path == "-" else open(path, "r")
+    try:
+        lines = (ln for ln in fh if ln.strip())
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size))
+            if not chunk:
+                break
+            yield _parse_csv_lines(chunk, source=path)
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+def write_values(fh: TextIO, values: np.ndarray) -> None:
+    """
+    Write one value per line (same formatting as printing a single distance).
+    A 2D array is written as one comma-separated line per row.
+    """
+    if len(values) == 0:
+        return
+    if values.ndim == 2:
+        lines = (",".join(map(str, row)) for row in values.tolist())
+    else:
+        lines = map(str, values.tolist())
+    fh.write("\n".join(lines))
+    fh.write("\n")
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 import numpy as np
-from .utils import to_1d_float_array, validate_same_shape, ArrayLike
+from .utils import to_1d_float_array, validate_same_shape, ArrayLike, Precision
 
 
-def chebyshev_distance(a: ArrayLike, b: ArrayLike) -> float:
+def chebyshev_distance(
+    a: ArrayLike, b: ArrayLike, *, precision: Precision = "float64"
+) -> float:
     """
     Chebyshev distance (L-infinity): max_i |a_i - b_i|
+    With precision="native" the difference is taken in the inputs' own dtype.
     """
-    va = to_1d_float_array(a, name="a")
-    vb = to_1d_float_array(b, name="b")
+    va = to_1d_float_array(a, name="a", precision=precision)
+    vb = to_1d_float_array(b, name="b", precision=precision)
     validate_same_shape(va, vb)
 
     return float(np.max(np.abs(va - vb)))
@@ -30,17 +33,24 @@ def hamming_distance(a: ArrayLike, b: ArrayLike) -> int:
     return int(np.sum(va != vb))
 
 
-def cosine_distance(a: ArrayLike, b: ArrayLike) -> float:
+def cosine_distance(
+    a: ArrayLike, b: ArrayLike, *, precision: Precision = "float64"
+) -> float:
     """
     Cosine distance: 1 - (a·b / (||a|| * ||b||))
 
     Zero-vector behavior 
     - if both are zero vectors -> distance = 0.0
     - if only one is zero -> distance = 1.0
+
+    Dot product and norms are always accumulated in float64, whatever the
+    precision policy.
     """
-    va = to_1d_float_array(a, name="a")
-    vb = to_1d_float_array(b, name="b")
+    va = to_1d_float_array(a, name="a", precision=precision)
+    vb = to_1d_float_array(b, name="b", precision=precision)
     validate_same_shape(va, vb)
+    va = va.astype(np.float64, copy=False)
+    vb = vb.astype(np.float64, copy=False)
 
     na = float(np.linalg.norm(va))
     nb = float(np.linalg.norm(vb))
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from .corpus import Corpus, open_corpus
+from .pairwise import _get_kernel, pairwise_distances, result_dtype, iter_blocks
+from .utils import Precision, resolve_dtype
+
+DEFAULT_TILE_SIZE = 2048  # rows/cols per tile
+
+
+def iter_upper_tiles(n: int, tile_size: int) -> Iterator[Tuple[slice, slice]]:
+    """
+    Yield (rows, cols) tiles of the (n x n) matrix on or above the diagonal.
+    The metrics are symmetric, so the tiles below are their transposes.
+    """
+    blocks: List[slice] = list(iter_blocks(n, tile_size))
+    for i, rows in enumerate(blocks):
+        for cols in blocks[i:]:
+            yield rows, cols
+
+
+def _compute_tile(
+    shm_name: str,
+    shape: Tuple[int, int],
+    dtype: str,
+    out_path: str,
+    metric: str,
+    precision: Precision,
+    rows: slice,
+    cols: slice,
+) -> None:
+    """
+    Worker: compute one tile from the shared input and write it (and its
+    mirror image) into the memory-mapped output.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        X = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        D = pairwise_distances(X[rows], X[cols], metric=metric, precision=precision)
+        del X
+        out = np.load(out_path, mmap_mode="r+")
+        out[rows, cols] = D
+        if rows != cols:
+            out[cols, rows] = D.T
+        out.flush()
+        del out
+    finally:
+        shm.close()
+
+
+def parallel_pairwise_distances(
+    X: Corpus,
+    out: str,
+    metric: str = "cosine",
+    *,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    n_jobs: Optional[int] = None,
+    precision: Precision = "float64",
+) -> np.ndarray:
+    """
+    All-pairs (n x n) distance matrix of the rows of X, computed in parallel.
+
+    X (array or .npy path) is copied once into shared memory; worker processes
+    compute (tile_size x tile_size) tiles and write them into the memory-mapped
+    .npy file `out`. Only tiles on or above the diagonal are computed, the
+    others are filled by symmetry. n_jobs defaults to the number of CPUs.
+
+    Returns the output as a read-only memmap.
+    """
+    if tile_size < 1:
+        raise ValueError("tile_size must be >= 1")
+    _get_kernel(metric)
+    arr = open_corpus(X)
+    # hamming compares raw values; the other metrics work on floats
+    in_dtype = arr.dtype if metric == "hamming" else resolve_dtype(arr, precision)
+    if in_dtype.hasobject:
+        raise ValueError("X must have a fixed-size dtype to be shared")
+
+    n = arr.shape[0]
+    dtype = result_dtype(metric, in_dtype)
+    result = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=(n, n))
+    del result  # workers reopen it
+
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(1, arr.shape[0] * arr.shape[1] * in_dtype.itemsize))
+    try:
+        shared = np.ndarray(arr.shape, dtype=in_dtype, buffer=shm.buf)
+        for sl in iter_blocks(n, tile_size):  # copy without loading X at once
+            shared[sl] = arr[sl]
+        del shared
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [
+                pool.submit(_compute_tile, shm.name, arr.shape, in_dtype.str, out,
+                            metric, precision, rows, cols)
+                for rows, cols in iter_upper_tiles(n, tile_size)
+            ]
+            for f in futures:
+                f.result()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return np.load(out, mmap_mode="r")
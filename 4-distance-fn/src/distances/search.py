@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+from .corpus import Corpus, DEFAULT_BLOCK_SIZE, iter_corpus_blocks, open_corpus
+from .pairwise import (
+    DEFAULT_WORKING_MEMORY, _cosine_exact, cosine_block_error, iter_blocks,
+    pairwise_distances, result_dtype,
+)
+from .utils import ArrayLike, Precision, resolve_dtype
+
+
+def select_topk(
+    dists: np.ndarray,
+    idx: np.ndarray,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the k smallest distances per row, ordered by (distance, index).
+
+    dists, idx: (n_rows, n_cand) with idx increasing along each row, so among
+    equal distances the lower corpus index wins (deterministic tie-breaking).
+    Returns (idx, dists) of shape (n_rows, min(k, n_cand)).
+    """
+    n_rows, n_cand = dists.shape
+    if k < n_cand:
+        kth = np.partition(dists, k - 1, axis=1)[:, k - 1:k]
+        less = dists < kth
+        ties = dists == kth
+        # fill the remaining slots with the first (lowest-index) ties
+        need = k - less.sum(axis=1, keepdims=True)
+        keep = less | (ties & (np.cumsum(ties, axis=1) <= need))
+        rows, cols = np.nonzero(keep)
+        cols = cols.reshape(n_rows, k)
+        dists = np.take_along_axis(dists, cols, axis=1)
+        idx = np.take_along_axis(idx, cols, axis=1)
+
+    order = np.lexsort((idx, dists), axis=-1)
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(dists, order, axis=1)
+
+
+def select_topk_block(
+    D: np.ndarray,
+    start: int,
+    k: int,
+    Q: np.ndarray,
+    block: np.ndarray,
+    metric: str,
+    *,
+    working_memory: int = DEFAULT_WORKING_MEMORY,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k of one corpus block, ordered by (distance, index) whatever the
+    block shape.
+
+    D is the block's distance matrix for queries Q against corpus rows
+    block = corpus[start:start + len(block)]. Chebyshev and hamming entries
+    are exact already. Cosine entries come from a matrix product whose
+    rounding depends on the block shape, so every entry within twice the
+    error bound of the k-th distance is re-scored with a per-pair kernel
+    (in chunks of at most working_memory bytes) before selecting; the rest
+    cannot reach the top k. D is overwritten.
+    """
+    idx = np.broadcast_to(np.arange(start, start + D.shape[1]), D.shape)
+    if metric == "cosine" and D.size:
+        kk = min(k, D.shape[1])
+        kth = np.partition(D, kk - 1, axis=1)[:, kk - 1:kk]
+        err = cosine_block_error(Q.shape[1])
+        rows, cols = np.nonzero(D <= kth + 2.0 * err)
+        step = max(1, working_memory // (3 * 8 * max(1, Q.shape[1])))
+        for sl in iter_blocks(rows.size, step):
+            r, c = rows[sl], cols[sl]
+            D[r, c] = _cosine_exact(Q[r], block[c])
+    return select_topk(D, idx, k)
+
+
+def topk(
+    query: ArrayLike,
+    corpus: Corpus,
+    k: int,
+    metric: str = "cosine",
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    precision: Precision = "float64",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k nearest corpus rows for each query vector.
+
+    The corpus (array or .npy path) is scanned block by block and a running
+    top-k per query is merged with each block, so memory is O(k) per query
+    plus one block. Cosine distances near the k-th are re-scored with a
+    shape-independent kernel (see select_topk_block), so the result does not
+    depend on block_size and ties are broken by the lower corpus index.
+
+    Returns (indices, distances): 1D for a single 1D query, else (n_queries, k).
+    """
+    if k < 1:
+        raise ValueError("k must be >= 1")
+    single = np.ndim(query) == 1
+    Q = np.asarray(query)
+    if single:
+        Q = Q.reshape(1, -1)
+
+    arr = open_corpus(corpus)
+    dtype = result_dtype(metric, resolve_dtype(Q, precision),
+                         resolve_dtype(arr, precision))
+    best_i = np.empty((Q.shape[0], 0), dtype=np.int64)
+    best_d = np.empty((Q.shape[0], 0), dtype=dtype)
+
+    for sl, block in iter_corpus_blocks(arr, block_size):
+        D = pairwise_distances(Q, block, metric=metric, precision=precision)
+        block_i, block_d = select_topk_block(D, sl.start, k, Q, block, metric)
+        best_i, best_d = select_topk(
+            np.hstack([best_d, block_d]), np.hstack([best_i, block_i]), k)
+
+    if single:
+        return best_i[0], best_d[0]
+    return best_i, best_d
@@ -1,16 +1,48 @@
 from __future__ import annotations
 
-from typing import Iterable, Union
+from typing import Iterable, Literal, Union
 import numpy as np
 
 ArrayLike = Union[Iterable[float], np.ndarray]
 
+# Dtype policy:
+# - "float64" (default): every input is converted to float64.
+# - "native": float16/float32/float64 inputs keep their precision (other
+#   dtypes become float64). Dot products and norms are still accumulated in
+#   float64; element-wise work (e.g. Chebyshev) runs in the native dtype.
+#   Tolerance against the "float64" policy on the same stored values:
+#   cosine agrees to float64 rounding (~1e-15); Chebyshev differs by one
+#   rounding of |a_i - b_i|, i.e. a relative error <= 6e-8 (float32) or
+#   <= 5e-4 (float16). Storing float64 data as float32/float16 first adds
+#   the input rounding on top (~1e-7 / ~1e-3 relative).
+Precision = Literal["float64", "native"]
 
-def to_1d_float_array(x: ArrayLike, *, name: str) -> np.ndarray:
+
+def resolve_dtype(x: np.ndarray, precision: Precision = "float64") -> np.dtype:
+    """
+    Floating dtype to compute with under the given precision policy.
+    """
+    if precision == "float64":
+        return np.dtype(np.float64)
+    if precision == "native":
+        if x.dtype in (np.float16, np.float32, np.float64):
+            return x.dtype
+        return np.dtype(np.float64)
+    raise ValueError("precision must be one of {'float64','native'}")
+
+
+def _as_float_array(x: ArrayLike, precision: Precision) -> np.ndarray:
+    arr = np.asarray(x)
+    return arr.astype(resolve_dtype(arr, precision), copy=False)
+
+
+def to_1d_float_array(
+    x: ArrayLike, *, name: str, precision: Precision = "float64"
+) -> np.ndarray:
     """
     Convert input to a 1D float numpy array. Raises ValueError on invalid shape.
     """
-    arr = np.asarray(x, dtype=float)
+    arr = _as_float_array(x, precision)
 
     if arr.ndim != 1:
         # We keep it strict and simple (vectors only).
@@ -19,6 +51,23 @@ def to_1d_float_array(x: ArrayLike, *, name: str) -> np.ndarray:
     return arr
 
 
+def to_2d_float_array(
+    x: ArrayLike, *, name: str, precision: Precision = "float64"
+) -> np.ndarray:
+    """
+    Convert input to a 2D float numpy array (one vector per row).
+    A single 1D vector is promoted to a 1-row matrix.
+    """
+    arr = _as_float_array(x, precision)
+
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    if arr.ndim != 2:
+        raise ValueError(f"{name} must be a 2D matrix. Got shape={arr.shape}")
+
+    return arr
+
+
 def validate_same_shape(a: np.ndarray, b: np.ndarray) -> None:
     if a.shape != b.shape:
         raise ValueError(
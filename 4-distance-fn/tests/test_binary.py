@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from distances.binary import pack_binary, pack_categorical, hamming_packed, popcount
+from distances.pairwise import pairwise_distances
+
+
+def test_packed_matches_hamming_wide():
+    rng = np.random.default_rng(0)
+    A = rng.integers(0, 2, size=(5, 130))
+    B = rng.integers(0, 2, size=(4, 130))
+    PA, PB = pack_binary(A), pack_binary(B)
+    assert PA.words.dtype == np.uint64 and PA.words.shape == (5, 3)
+    assert (hamming_packed(PA, PB) == pairwise_distances(A, B, metric="hamming")).all()
+
+
+def test_packed_one_vs_many():
+    q = pack_binary([1, 0, 1, 1])
+    corpus = pack_binary([[1, 1, 1, 0], [1, 0, 1, 1]])
+    assert hamming_packed(q, corpus).tolist() == [[2, 0]]
+
+
+def test_packed_categorical():
+    A = np.array([["a", "x"], ["b", "y"], ["c", "x"]])
+    PA, cats = pack_categorical(A)
+    PB, _ = pack_categorical(np.array([["a", "y"]]), cats)
+    assert hamming_packed(PB, PA).tolist() == [[1, 1, 2]]
+    with pytest.raises(ValueError):
+        pack_categorical(np.array([["z", "x"]]), cats)
+
+
+def test_pack_binary_rejects_non_binary():
+    with pytest.raises(ValueError):
+        pack_binary([0, 2, 1])
+
+
+def test_popcount():
+    w = np.array([0, 1, 0xFF, 2**64 - 1], dtype=np.uint64)
+    assert popcount(w).tolist() == [0, 1, 8, 64]
@@ -0,0 +1,27 @@
+import numpy as np
+from distances.corpus import query_corpus
+from distances.pairwise import pairwise_distances
+
+
+def test_query_corpus_mmap_blocks(tmp_path):
+    rng = np.random.default_rng(0)
+    corpus = rng.normal(size=(23, 4))
+    path = tmp_path / "corpus.npy"
+    np.save(path, corpus)
+    Q = rng.normal(size=(3, 4))
+
+    D = query_corpus(Q, str(path), metric="chebyshev", block_size=5)
+    assert D.shape == (3, 23)
+    assert np.array_equal(D, pairwise_distances(Q, corpus, metric="chebyshev"))
+
+    d1 = query_corpus(Q[0], str(path), metric="cosine", block_size=7)
+    assert d1.shape == (23,)
+
+
+def test_query_corpus_memmap_output(tmp_path):
+    corpus = np.array([[1, 0, 1], [0, 0, 1], [1, 1, 1]])
+    path = tmp_path / "corpus.npy"
+    np.save(path, corpus)
+    out = tmp_path / "out.npy"
+    query_corpus([[1, 0, 1]], str(path), metric="hamming", block_size=2, out=str(out))
+    assert np.load(out).tolist() == [[0, 1, 1]]
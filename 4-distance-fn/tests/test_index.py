@@ -0,0 +1,30 @@
+import numpy as np
+from distances.index import CosineIndex
+from distances.metrics import cosine_distance
+from distances.search import topk
+
+
+def test_cosine_index_matches_per_pair():
+    rng = np.random.default_rng(0)
+    corpus = rng.normal(size=(12, 5))
+    corpus[3] = 0.0
+    Q = rng.normal(size=(4, 5))
+    Q[1] = 0.0
+    index = CosineIndex(corpus)
+    D = index.distances(Q)
+    ref = np.array([[cosine_distance(q, c) for c in corpus] for q in Q])
+    assert np.allclose(D, ref, rtol=0, atol=1e-12)
+    assert D[1, 3] == 0.0  # both zero
+    assert (D[1, np.arange(12) != 3] == 1.0).all()  # query zero
+    assert (D[[0, 2, 3], 3] == 1.0).all()  # corpus row zero
+
+
+def test_cosine_index_topk():
+    rng = np.random.default_rng(1)
+    corpus = rng.normal(size=(40, 3))
+    index = CosineIndex(corpus)
+    idx, d = index.topk(corpus[5], k=4, block_size=9)
+    ref_idx, _ = topk(corpus[5], corpus, k=4, metric="cosine")
+    assert idx[0] == 5
+    assert (idx == ref_idx).all()
+    assert d.shape == (4,)
@@ -0,0 +1,19 @@
+import numpy as np
+from distances.io import iter_vector_chunks
+
+
+def test_iter_chunks_csv(tmp_path):
+    p = tmp_path / "v.csv"
+    p.write_text("1,2\n3,4\n\n5,6\n")
+    chunks = list(iter_vector_chunks(str(p), chunk_size=2))
+    assert [c.shape for c in chunks] == [(2, 2), (1, 2)]
+    assert np.vstack(chunks).tolist() == [[1, 2], [3, 4], [5, 6]]
+
+
+def test_iter_chunks_npy(tmp_path):
+    p = tmp_path / "v.npy"
+    X = np.arange(24, dtype=np.float32).reshape(4, 2, 3)
+    np.save(p, X)
+    chunks = list(iter_vector_chunks(str(p), chunk_size=3))
+    assert [c.shape for c in chunks] == [(3, 6), (1, 6)]
+    assert np.array_equal(np.vstack(chunks), X.reshape(4, 6))
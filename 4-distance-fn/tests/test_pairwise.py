@@ -0,0 +1,62 @@
+import numpy as np
+from distances.metrics import cosine_distance, chebyshev_distance, hamming_distance
+from distances.pairwise import pairwise_distances, paired_distances
+
+
+def _reference(A, B, func):
+    return np.array([[func(a, b) for b in B] for a in A])
+
+
+def test_pairwise_matches_per_pair():
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(7, 5))
+    B = rng.normal(size=(4, 5))
+    for metric, func in [("cosine", cosine_distance), ("chebyshev", chebyshev_distance)]:
+        D = pairwise_distances(A, B, metric=metric)
+        assert D.shape == (7, 4)
+        assert np.allclose(D, _reference(A, B, func), rtol=0, atol=1e-12)
+
+
+def test_pairwise_documented_tolerance():
+    rng = np.random.default_rng(5)
+    for d in (5, 64):
+        A = rng.normal(size=(200, d))
+        B = rng.normal(size=(150, d))
+        assert (pairwise_distances(A, B, metric="chebyshev")
+                == _reference(A, B, chebyshev_distance)).all()
+        cos = pairwise_distances(A, B, metric="cosine")
+        assert np.abs(cos - _reference(A, B, cosine_distance)).max() <= 1e-15
+
+
+def test_pairwise_hamming_exact():
+    rng = np.random.default_rng(1)
+    A = rng.integers(0, 3, size=(6, 8))
+    B = rng.integers(0, 3, size=(5, 8))
+    D = pairwise_distances(A, B, metric="hamming")
+    assert D.dtype.kind == "i"
+    assert (D == _reference(A, B, hamming_distance)).all()
+
+
+def test_pairwise_cosine_zero_vectors():
+    A = np.array([[0.0, 0.0], [1.0, 0.0]])
+    D = pairwise_distances(A, metric="cosine")
+    assert D[0, 0] == 0.0  # both zero
+    assert D[0, 1] == 1.0 and D[1, 0] == 1.0  # one zero
+
+
+def test_pairwise_small_blocks_same_result():
+    rng = np.random.default_rng(2)
+    A = rng.normal(size=(20, 3))
+    full = pairwise_distances(A, metric="chebyshev")
+    tiny = pairwise_distances(A, metric="chebyshev", working_memory=1)
+    assert (full == tiny).all()
+
+
+def test_paired_distances_rowwise():
+    A = np.array([[1.0, 2.0, 3.0], [0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+    B = np.array([[4.0, 0.0, 6.0], [0.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    assert paired_distances(A, B, metric="chebyshev").tolist() == [3.0, 0.0, 1.0]
+    assert paired_distances(A, B, metric="hamming").tolist() == [3, 0, 2]
+    cos = paired_distances(A, B, metric="cosine")
+    assert abs(cos[0] - cosine_distance(A[0], B[0])) < 1e-12
+    assert cos[1] == 0.0 and cos[2] == 1.0
@@ -0,0 +1,31 @@
+import numpy as np
+from distances.pairwise import pairwise_distances
+from distances.parallel import parallel_pairwise_distances, iter_upper_tiles
+
+
+def test_upper_tiles_cover_half():
+    tiles = list(iter_upper_tiles(10, 4))
+    assert len(tiles) == 6  # 3 blocks -> 3 * 4 / 2
+
+
+def test_parallel_matches_pairwise(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(11, 4))
+    for metric in ("chebyshev", "cosine"):
+        out = tmp_path / f"{metric}.npy"
+        D = parallel_pairwise_distances(X, str(out), metric=metric, tile_size=4, n_jobs=2)
+        ref = pairwise_distances(X, metric=metric)
+        assert D.shape == (11, 11)
+        assert np.allclose(D, ref, rtol=0, atol=1e-12)
+        assert np.array_equal(D, D.T)
+
+
+def test_parallel_hamming_from_npy(tmp_path):
+    rng = np.random.default_rng(1)
+    X = rng.integers(0, 2, size=(9, 16)).astype(np.int8)
+    src = tmp_path / "x.npy"
+    np.save(src, X)
+    D = parallel_pairwise_distances(str(src), str(tmp_path / "d.npy"), metric="hamming",
+                                    tile_size=3, n_jobs=2)
+    assert D.dtype == np.int64
+    assert np.array_equal(D, pairwise_distances(X, metric="hamming"))
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from distances.metrics import cosine_distance, chebyshev_distance
+from distances.pairwise import pairwise_distances
+from distances.index import CosineIndex
+from distances.utils import to_1d_float_array
+
+
+def test_native_keeps_float32():
+    v = to_1d_float_array(np.ones(3, dtype=np.float32), name="v", precision="native")
+    assert v.dtype == np.float32
+    v = to_1d_float_array([1, 2, 3], name="v", precision="native")
+    assert v.dtype == np.float64
+    with pytest.raises(ValueError):
+        to_1d_float_array([1.0], name="v", precision="float8")
+
+
+@pytest.mark.parametrize("dtype,rtol", [(np.float32, 6e-8), (np.float16, 5e-4)])
+def test_native_within_tolerance(dtype, rtol):
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(6, 16)).astype(dtype)
+    B = rng.normal(size=(5, 16)).astype(dtype)
+
+    cos = pairwise_distances(A, B, metric="cosine", precision="native")
+    assert cos.dtype == np.float64
+    assert np.allclose(cos, pairwise_distances(A, B, metric="cosine"), rtol=0, atol=1e-12)
+    assert abs(cosine_distance(A[0], B[0], precision="native")
+               - cosine_distance(A[0], B[0])) < 1e-12
+
+    cheb = pairwise_distances(A, B, metric="chebyshev", precision="native")
+    assert cheb.dtype == dtype
+    assert np.allclose(cheb, pairwise_distances(A, B, metric="chebyshev"), rtol=rtol, atol=0)
+    assert abs(chebyshev_distance(A[0], B[0], precision="native")
+               - chebyshev_distance(A[0], B[0])) <= rtol * chebyshev_distance(A[0], B[0])
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float16])
+def test_cosine_index_native_storage(dtype):
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(50, 8)).astype(dtype)
+    index = CosineIndex(X, precision="native")
+    assert index.corpus_.dtype == dtype
+    # same stored values: float64 rounding only (utils policy)
+    ref = CosineIndex(X.astype(np.float64))
+    assert np.allclose(index.distances(X[:5]), ref.distances(X[:5]), rtol=0, atol=1e-12)
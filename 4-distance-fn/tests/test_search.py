@@ -0,0 +1,51 @@
+import numpy as np
+from distances.pairwise import pairwise_distances
+from distances.search import topk
+
+
+def test_topk_matches_full_sort():
+    rng = np.random.default_rng(0)
+    corpus = rng.normal(size=(50, 4))
+    Q = rng.normal(size=(3, 4))
+    idx, d = topk(Q, corpus, k=5, metric="cosine", block_size=7)
+    D = pairwise_distances(Q, corpus, metric="cosine")
+    expected = np.argsort(D, axis=1, kind="stable")[:, :5]
+    assert idx.shape == (3, 5)
+    assert (idx == expected).all()
+    # re-scored near the k-th, so equal to the matrix product up to rounding
+    assert np.allclose(d, np.take_along_axis(D, expected, axis=1), rtol=0, atol=1e-15)
+
+
+def test_topk_ties_prefer_lower_index():
+    corpus = np.array([[1, 1], [0, 0], [1, 1], [1, 1], [0, 1]])
+    idx, d = topk([1, 1], corpus, k=3, metric="hamming", block_size=2)
+    assert idx.tolist() == [0, 2, 3]
+    assert d.tolist() == [0, 0, 0]
+    idx, _ = topk([0, 1], corpus, k=3, metric="hamming", block_size=1)
+    assert idx.tolist() == [4, 0, 1]
+
+
+def test_topk_k_larger_than_corpus():
+    idx, d = topk([0.0, 1.0], np.array([[0.0, 3.0], [1.0, 0.0]]), k=10, metric="chebyshev")
+    assert idx.tolist() == [1, 0]
+
+
+def test_topk_cosine_ties_independent_of_block_size():
+    from distances.index import CosineIndex
+    for seed in range(5):
+        rng = np.random.default_rng(seed)
+        X = np.round(rng.normal(size=(3000, 6)), 1) * rng.uniform(0.1, 10)
+        # rows 3000.. are exact multiples of rows 0..499: equal cosine distances
+        X = np.vstack([X, X[:500] * 2])
+        Q = np.vstack([rng.normal(size=(8, 6)), X[:4] + 0.01])
+        idx, d = topk(Q, X, k=10)
+        for bs in (7, 500, 1024):
+            i2, d2 = topk(Q, X, k=10, block_size=bs)
+            assert np.array_equal(idx, i2) and np.array_equal(d, d2)
+        i3, d3 = CosineIndex(X).topk(Q, 10, block_size=333)
+        assert np.array_equal(idx, i3) and np.array_equal(d, d3)
+        # tied pairs keep the lower index first
+        for row_i, row_d in zip(idx, d):
+            for a in range(9):
+                if row_d[a] == row_d[a + 1]:
+                    assert row_i[a] < row_i[a + 1]
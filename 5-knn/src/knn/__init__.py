@@ -1,14 +1,22 @@
-from .distances import l1, l2, cosine
+from .distances import l1, l2, cosine, MetricSpec, register_metric, get_metric, available_metrics
 from .neighbors import kneighbors
 from .model import KNNClassifier
-from .preprocessing import StandardScaler, Pipeline
+from .preprocessing import StandardScaler, Pipeline, TransformCache
+from .persistence import save_model, load_model
 
 __all__ = [
     "l1",
     "l2",
     "cosine",
+    "MetricSpec",
+    "register_metric",
+    "get_metric",
+    "available_metrics",
     "kneighbors",
     "KNNClassifier",
     "StandardScaler",
     "Pipeline",
+    "TransformCache",
+    "save_model",
+    "load_model",
 ]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import sys
+import time
+import numpy as np
+from typing import Any, Iterator, TextIO
+
+Array = np.ndarray
+
+DEFAULT_CHUNK_SIZE = 65536  # rows per chunk
+
+def _is_npy(path: str) -> bool:
+    return path.endswith(".npy")
+
+def _data_lines(fh: TextIO) -> Iterator[str]:
+    for line in fh:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+def count_rows(path: str) -> int:
+    """Number of rows in a .npy (from its header) or CSV file (one pass over the lines)."""
+    if _is_npy(path):
+        return int(np.load(path, mmap_mode="r").shape[0])
+    with open(path) as fh:
+        return sum(1 for _ in _data_lines(fh))
+
+def iter_row_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Array]:
+    """
+    Yield float matrices of at most chunk_size rows. A .npy file is memory-mapped;
+    a CSV (one row per line, '#' comments and blank lines skipped) is parsed
+    chunk by chunk, so neither is loaded at once.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    if _is_npy(path):
+        arr = np.load(path, mmap_mode="r")
+        if arr.ndim != 2:
+            raise ValueError(f"{path} must hold a 2D matrix. Got shape={arr.shape}")
+        for start in range(0, len(arr), chunk_size):
+            yield np.asarray(arr[start:start + chunk_size], dtype=float)
+        return
+    with open(path) as fh:
+        buf = []
+        for line in _data_lines(fh):
+            buf.append(line)
+            if len(buf) == chunk_size:
+                yield np.loadtxt(buf, delimiter=",", dtype=float, ndmin=2)
+                buf = []
+        if buf:
+            yield np.loadtxt(buf, delimiter=",", dtype=float, ndmin=2)
+
+class _CsvWriter:
+    def __init__(self, path: str, classes: Array | None):
+        self.fh = sys.stdout if path == "-" else open(path, "w")
+        header = ["pred"] + ([f"proba_{c}" for c in classes] if classes is not None else [])
+        self.fh.write(",".join(header) + "\n")
+
+    def write(self, start: int, pred: Array, proba: Array | None) -> None:
+        if proba is None:
+            self.fh.write("".join(f"{p}\n" for p in pred.tolist()))
+        else:
+            self.fh.write("".join(
+                f"{p}," + ",".join(repr(v) for v in row) + "\n"
+                for p, row in zip(pred.tolist(), proba.tolist())))
+
+    def close(self) -> None:
+        if self.fh is not sys.stdout:
+            self.fh.close()
+
+class _NpyWriter:
+    """Preallocated memory-mapped outputs; probabilities go to '<stem>.proba.npy'."""
+    def __init__(self, path: str, n_rows: int, classes: Array, proba: bool):
+        self.pred = np.lib.format.open_memmap(path, mode="w+", dtype=classes.dtype, shape=(n_rows,))
+        self.proba = None
+        if proba:
+            self.proba = np.lib.format.open_memmap(
+                path[:-4] + ".proba.npy", mode="w+", dtype=float, shape=(n_rows, len(classes)))
+
+    def write(self, start: int, pred: Array, proba: Array | None) -> None:
+        self.pred[start:start + len(pred)] = pred
+        if proba is not None:
+            self.proba[start:start + len(pred)] = proba
+
+    def close(self) -> None:
+        for out in (self.pred, self.proba):
+            if out is not None:
+                out.flush()
+
+def _classes(model: Any) -> Array:
+    last = model.steps[-1][1] if hasattr(model, "steps") else model
+    return last.classes_
+
+def predict_file(
+    model: Any,
+    input_path: str,
+    output_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    proba: bool = False,
+) -> tuple[int, float]:
+    """
+    Stream input rows (.npy or CSV) through a fitted model chunk by chunk and
+    write predictions incrementally, with per-class probabilities if proba.
+    A .npy output is preallocated and memory-mapped; for a CSV input that
+    costs one extra pass to count the rows. A CSV output ('-' for stdout)
+    has a header 'pred[,proba_<class>...]'. Returns (rows, seconds).
+    """
+    t0 = time.perf_counter()
+    classes = _classes(model)
+    if _is_npy(output_path):
+        writer = _NpyWriter(output_path, count_rows(input_path), classes, proba)
+    else:
+        writer = _CsvWriter(output_path, classes if proba else None)
+    n = 0
+    try:
+        for chunk in iter_row_chunks(input_path, chunk_size):
+            if proba:
+                pred, prob = model.predict_with_proba(chunk)
+            else:
+                pred, prob = model.predict(chunk), None
+            writer.write(n, pred, prob)
+            n += len(chunk)
+    finally:
+        writer.close()
+    return n, time.perf_counter() - t0
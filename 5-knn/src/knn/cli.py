@@ -1,33 +1,44 @@
 from __future__ import annotations
 import argparse
+import functools
 import json
+import sys
 from typing import List
 import numpy as np
 
 from . import KNNClassifier, StandardScaler, Pipeline
+from .distances import available_metrics
 from .data import load_iris
-from .cv import KFold, LeaveOneOut, cross_validate
-from .metrics import sensitivity, specificity, balanced_accuracy
-from .reporting import format_folds_table, format_summary_table
+from .cv import KFold, LeaveOneOut, cross_validate, knn_leave_one_out, k_sweep
+from .metrics import classification_metrics
+from .reporting import format_folds_table, format_summary_table, format_k_sweep_table
+from .persistence import save_model, load_model
 
 # ---- helpers ----
 
 def _make_pipeline(k: int, metric_name: str) -> Pipeline:
-    from .distances import l2, l1, cosine
-    metrics = {"l2": l2, "l1": l1, "cosine": cosine}
-    if metric_name not in metrics:
-        raise ValueError(f"Unknown metric '{metric_name}'. Use one of {list(metrics)}")
+    # KNNClassifier resolves the name through the metric registry (ValueError if unknown)
     return Pipeline([
         ("scaler", StandardScaler()),
-        ("clf", KNNClassifier(k=k, metric=metrics[metric_name])),
+        ("clf", KNNClassifier(k=k, metric=metric_name)),
     ])
 
-def _metrics_dict():
-    return {
-        "macro_sensitivity": lambda yt, yp: sensitivity(yt, yp, average="macro"),
-        "macro_specificity": lambda yt, yp: specificity(yt, yp, average="macro"),
-        "balanced_accuracy": balanced_accuracy,
-    }
+def _parse_ks(text: str) -> List[int]:
+    """'5' or '1,3,5' -> list of k values."""
+    try:
+        ks = [int(v) for v in text.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"--k must be an int or a comma-separated list, got '{text}'")
+    if not ks or min(ks) < 1:
+        raise argparse.ArgumentTypeError("--k values must be >= 1")
+    return ks
+
+METRIC_NAMES = ("macro_sensitivity", "macro_specificity", "balanced_accuracy")
+
+def _fold_metrics(yt: np.ndarray, yp: np.ndarray) -> dict:
+    # all reported metrics from one confusion matrix per fold
+    scores = classification_metrics(yt, yp)
+    return {name: scores[name] for name in METRIC_NAMES}
 
 # ---- subcommands ----
 
@@ -37,10 +48,12 @@ def cmd_cv(args: argparse.Namespace) -> int:
     else:
         raise SystemExit(f"Unsupported dataset: {args.dataset}")
 
-    def pipe_factory():
-        return _make_pipeline(args.k, args.metric)
+    metrics = _fold_metrics
+    ks = args.k
+    k = ks[0]
 
-    metrics = _metrics_dict()
+    # a partial of a module-level function pickles, so it also works with --backend process
+    pipe_factory = functools.partial(_make_pipeline, k, args.metric)
 
     if args.fold == "kfold":
         splitter = KFold(n_splits=args.n_splits, shuffle=not args.no_shuffle, random_state=args.seed)
@@ -49,16 +62,62 @@ def cmd_cv(args: argparse.Namespace) -> int:
     else:
         raise SystemExit("fold must be one of {'kfold','loo'}")
 
-    res = cross_validate(pipe_factory, X, y, splitter, metrics)
+    if len(ks) > 1:
+        # one neighbor ranking per fold, scored for every k
+        res = k_sweep(X, y, splitter, ks, metrics, metric=args.metric)
+        print("\n\n".join(format_k_sweep_table(res, name) for name in METRIC_NAMES))
+        return 0
+
+    if args.fold == "loo" and args.loo_mode != "pipeline":
+        # one distance matrix instead of a refitted pipeline per sample
+        res = knn_leave_one_out(X, y, k, args.metric, metrics, scaling=args.loo_mode)
+    else:
+        res = cross_validate(pipe_factory, X, y, splitter, metrics,
+                             n_jobs=args.n_jobs, backend=args.backend)
     print(format_folds_table(res["folds"]))
     print()
     print(format_summary_table(res["summary"]))
     return 0
 
-def cmd_predict(args: argparse.Namespace) -> int:
-    # tiny convenience: load iris, fit on all, predict a single vector
-    X, y, _ = load_iris()
+def cmd_fit(args: argparse.Namespace) -> int:
+    if args.dataset == "iris":
+        X, y, _ = load_iris()
+    else:
+        raise SystemExit(f"Unsupported dataset: {args.dataset}")
     pipe = _make_pipeline(args.k, args.metric).fit(X, y)
+    save_model(args.out, pipe)
+    print(f"saved {len(X)} samples to {args.out}")
+    return 0
+
+def _load_or_fit(args: argparse.Namespace) -> Pipeline:
+    if args.model:
+        # saved by `knn fit`: memory-mapped, no dataset load and no refit
+        return load_model(args.model)
+    # tiny convenience: load iris, fit on all
+    X, y, _ = load_iris()
+    return _make_pipeline(args.k, args.metric).fit(X, y)
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    import asyncio
+    from .serve import serve, format_stats
+    pipe = _load_or_fit(args)
+    stats = asyncio.run(serve(pipe, socket_path=args.socket, max_batch=args.max_batch,
+                              max_wait_ms=args.max_wait_ms))
+    print(format_stats(stats), file=sys.stderr)
+    return 0
+
+def cmd_predict(args: argparse.Namespace) -> int:
+    pipe = _load_or_fit(args)
+
+    if args.input:
+        # bulk: stream the file in chunks, write predictions as they come
+        from .bulk import predict_file
+        if not args.output:
+            raise SystemExit("--input requires --output (preds.csv, preds.npy or '-')")
+        n, secs = predict_file(pipe, args.input, args.output,
+                               chunk_size=args.chunk_size, proba=args.proba)
+        print(f"predicted {n} rows in {secs:.2f}s ({n / max(secs, 1e-9):,.0f} rows/s)", file=sys.stderr)
+        return 0
 
     # parse features
     if args.features_json:
@@ -71,16 +130,11 @@ def cmd_predict(args: argparse.Namespace) -> int:
     if feats.ndim == 1:
         feats = feats.reshape(1, -1)
 
-    preds = pipe.predict(feats)
-    try:
-        probas = pipe.predict_proba(feats).tolist()
-    except AttributeError:
-        probas = None
+    # labels and probabilities from one neighbor search
+    preds, probas = pipe.predict_with_proba(feats)
 
     # print compact JSON to make it script-friendly
-    out = {"pred": preds.tolist()}
-    if probas is not None:
-        out["proba"] = probas
+    out = {"pred": preds.tolist(), "proba": probas.tolist()}
     print(json.dumps(out))
     return 0
 
@@ -94,22 +148,54 @@ def main():
     ap_cv = sub.add_parser("cv", help="Cross-validate on a dataset (iris)")
     ap_cv.add_argument("--dataset", default="iris", choices=["iris"])
     ap_cv.add_argument("--fold", default="kfold", choices=["kfold","loo"])
+    ap_cv.add_argument("--loo-mode", default="pipeline", choices=["pipeline", "exact", "global"],
+                       help="LOO only: refit the pipeline per sample, or one distance matrix with "
+                            "exact per-fold scaling / a single global scaler")
     ap_cv.add_argument("--n-splits", type=int, default=5, help="KFold splits (ignored for LOO)")
     ap_cv.add_argument("--no-shuffle", action="store_true", help="Disable shuffling for KFold")
     ap_cv.add_argument("--seed", type=int, default=42)
-    ap_cv.add_argument("--k", type=int, default=3, help="Number of neighbors")
-    ap_cv.add_argument("--metric", default="l2", choices=["l2","l1","cosine"])
+    ap_cv.add_argument("--n-jobs", type=int, default=1, help="Folds fitted in parallel (-1: all CPUs)")
+    ap_cv.add_argument("--backend", default="thread", choices=["thread", "process"],
+                       help="Worker pool for --n-jobs > 1")
+    ap_cv.add_argument("--k", type=_parse_ks, default=[3],
+                       help="Number of neighbors, or a list '1,3,5' to sweep k in one pass")
+    ap_cv.add_argument("--metric", default="l2", choices=available_metrics())
     ap_cv.set_defaults(func=cmd_cv)
 
+    # fit
+    ap_fit = sub.add_parser("fit", help="Fit on a dataset (iris) and save the model")
+    ap_fit.add_argument("--dataset", default="iris", choices=["iris"])
+    ap_fit.add_argument("--k", type=int, default=3)
+    ap_fit.add_argument("--metric", default="l2", choices=available_metrics())
+    ap_fit.add_argument("--out", required=True, help="Output model file (.npz)")
+    ap_fit.set_defaults(func=cmd_fit)
+
     # predict
-    ap_pred = sub.add_parser("predict", help="Fit on iris and predict a feature vector")
+    ap_pred = sub.add_parser("predict", help="Predict a feature vector (saved model, or fit on iris)")
+    ap_pred.add_argument("--model", help="Model saved by `knn fit` (--k/--metric are then ignored)")
     ap_pred.add_argument("--k", type=int, default=3)
-    ap_pred.add_argument("--metric", default="l2", choices=["l2","l1","cosine"])
+    ap_pred.add_argument("--metric", default="l2", choices=available_metrics())
     g = ap_pred.add_mutually_exclusive_group(required=True)
     g.add_argument("--features-csv", help="Comma-separated features 'f1,f2,...'")
     g.add_argument("--features-json", help="JSON array of features, e.g. '[5.1,3.5,1.4,0.2]'")
+    g.add_argument("--input", help="Bulk: rows to score, .csv or .npy (streamed in chunks)")
+    ap_pred.add_argument("--output", help="Bulk: preds.csv, preds.npy (memory-mapped) or '-' for stdout")
+    ap_pred.add_argument("--proba", action="store_true",
+                         help="Bulk: also write probabilities (extra CSV columns, or <stem>.proba.npy)")
+    ap_pred.add_argument("--chunk-size", type=int, default=65536, help="Bulk: rows per chunk")
     ap_pred.set_defaults(func=cmd_predict)
 
+    # serve
+    ap_srv = sub.add_parser("serve", help="Serve JSON-lines predictions with micro-batching")
+    ap_srv.add_argument("--model", help="Model saved by `knn fit` (default: fit on iris)")
+    ap_srv.add_argument("--k", type=int, default=3)
+    ap_srv.add_argument("--metric", default="l2", choices=available_metrics())
+    ap_srv.add_argument("--socket", help="Listen on this Unix socket path instead of stdin/stdout")
+    ap_srv.add_argument("--max-batch", type=int, default=64, help="Max requests per batch")
+    ap_srv.add_argument("--max-wait-ms", type=float, default=2.0,
+                        help="Max time a batch waits for more requests")
+    ap_srv.set_defaults(func=cmd_serve)
+
     args = ap.parse_args()
     raise SystemExit(args.func(args))
 
@@ -1,4 +1,6 @@
 from .splitters import KFold, LeaveOneOut
 from .cross_validate import cross_validate
+from .loo import knn_leave_one_out
+from .ksweep import k_sweep
 
-__all__ = ["KFold", "LeaveOneOut", "cross_validate"]
+__all__ = ["KFold", "LeaveOneOut", "cross_validate", "knn_leave_one_out", "k_sweep"]
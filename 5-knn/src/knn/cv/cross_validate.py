@@ -1,36 +1,134 @@
 from __future__ import annotations
 import numpy as np
-from typing import Callable, Dict, Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+
+BACKENDS = ("thread", "process")
+
+# {name: func(y_true, y_pred) -> float}, or one func(y_true, y_pred) -> {name: float}
+Metrics = Union[Dict[str, Callable[[np.ndarray, np.ndarray], float]],
+                Callable[[np.ndarray, np.ndarray], Dict[str, float]]]
+
+def _fit_predict(pipeline_factory: Callable[[], Any], X: np.ndarray, y: np.ndarray,
+                 tr_idx: np.ndarray, te_idx: np.ndarray) -> np.ndarray:
+    pipe = pipeline_factory()      # fresh pipeline per fold
+    pipe.fit(X[tr_idx], y[tr_idx])
+    return pipe.predict(X[te_idx])
+
+# ---- process backend: X and y live in shared memory, attached once per worker ----
+
+_shared: dict = {}
+
+def _to_shared(arr: np.ndarray) -> Tuple[shared_memory.SharedMemory, tuple]:
+    if arr.dtype.hasobject:
+        raise ValueError("backend='process' needs fixed-size dtypes for X and y (no object arrays)")
+    shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+def _attach(x_desc: tuple, y_desc: tuple) -> None:
+    """Worker initializer: map the shared X and y (kept open for the worker's lifetime)."""
+    for key, (name, shape, dtype) in (("X", x_desc), ("y", y_desc)):
+        shm = shared_memory.SharedMemory(name=name)
+        _shared[key + "_shm"] = shm
+        _shared[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+def _fit_predict_shared(pipeline_factory: Callable[[], Any],
+                        tr_idx: np.ndarray, te_idx: np.ndarray) -> np.ndarray:
+    return _fit_predict(pipeline_factory, _shared["X"], _shared["y"], tr_idx, te_idx)
+
+def _parallel_predictions(
+    pipeline_factory: Callable[[], Any],
+    X: np.ndarray,
+    y: np.ndarray,
+    splits: List[Tuple[np.ndarray, np.ndarray]],
+    n_jobs: int,
+    backend: str,
+) -> List[np.ndarray]:
+    """Test-set predictions of every fold, in fold order."""
+    if backend == "thread":
+        # threads share X and y directly; NumPy releases the GIL in the kernels
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(_fit_predict, pipeline_factory, X, y, tr, te) for tr, te in splits]
+            return [f.result() for f in futures]
+
+    X_shm, x_desc = _to_shared(np.ascontiguousarray(X))
+    try:
+        y_shm, y_desc = _to_shared(np.ascontiguousarray(y))
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_attach,
+                                     initargs=(x_desc, y_desc)) as pool:
+                futures = [pool.submit(_fit_predict_shared, pipeline_factory, tr, te)
+                           for tr, te in splits]
+                return [f.result() for f in futures]
+        finally:
+            y_shm.close()
+            y_shm.unlink()
+    finally:
+        X_shm.close()
+        X_shm.unlink()
 
 def cross_validate(
     pipeline_factory: Callable[[], Any],
     X: np.ndarray,
     y: np.ndarray,
     splitter,
-    metrics: Dict[str, Callable[[np.ndarray, np.ndarray], float]],
+    metrics: Metrics,
+    n_jobs: Optional[int] = None,
+    backend: str = "thread",
 ) -> dict:
     """
     Runs CV with a fresh pipeline per fold.
+
+    n_jobs > 1 fits the folds concurrently (n_jobs=-1: one worker per CPU).
+    backend="thread" shares X and y in-process; backend="process" copies them
+    once into shared memory instead of pickling them per fold, and needs a
+    picklable pipeline_factory (e.g. a module-level function or a
+    functools.partial of one). Splits and metrics are computed in the parent,
+    so results are identical to the serial run and in fold order.
+    metrics is either {name: func(y_true, y_pred) -> float} or one
+    func(y_true, y_pred) -> {name: float} (e.g. classification_metrics, which
+    scores a fold from a single confusion matrix).
     Returns:
       {
         'folds': [{'idx': i, 'n_train': ..., 'n_test': ..., 'metrics': {...}}, ...],
         'summary': {'metric': {'mean': ..., 'std': ...}, ...}
       }
     """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+    X = np.asarray(X)
+    y = np.asarray(y)
+    splits = list(splitter.split(X, y))
+
+    if n_jobs is None or n_jobs == 1 or len(splits) < 2:
+        preds = [_fit_predict(pipeline_factory, X, y, tr, te) for tr, te in splits]
+    else:
+        if n_jobs == -1:
+            n_jobs = None      # executor default: os.cpu_count()
+        elif n_jobs < 1:
+            raise ValueError("n_jobs must be >= 1 or -1")
+        preds = _parallel_predictions(pipeline_factory, X, y, splits, n_jobs, backend)
+
     folds = []
-    for i, (tr_idx, te_idx) in enumerate(splitter.split(X, y)):
-        pipe = pipeline_factory()      # fresh pipeline per fold
-        Xtr, ytr = X[tr_idx], y[tr_idx]
-        Xte, yte = X[te_idx], y[te_idx]
-        pipe.fit(Xtr, ytr)
-        yhat = pipe.predict(Xte)
-        mvals = {name: float(func(yte, yhat)) for name, func in metrics.items()}
+    for i, ((tr_idx, te_idx), yhat) in enumerate(zip(splits, preds)):
+        yte = y[te_idx]
+        mvals = _score(metrics, yte, yhat)
         folds.append({"idx": i, "n_train": int(len(tr_idx)), "n_test": int(len(te_idx)), "metrics": mvals})
 
-    # aggregate
+    return {"folds": folds, "summary": _summarize(folds)}
+
+def _score(metrics: Metrics, y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    """Metric values of one fold, from a dict of metrics or one dict-valued metric."""
+    if callable(metrics):
+        return {name: float(v) for name, v in metrics(y_true, y_pred).items()}
+    return {name: float(func(y_true, y_pred)) for name, func in metrics.items()}
+
+def _summarize(folds: list) -> dict:
+    """Mean and std (ddof=1) of every metric across folds."""
     summary: dict[str, dict[str, float]] = {}
-    for name in metrics.keys():
+    for name in (folds[0]["metrics"] if folds else ()):
         values = [f["metrics"][name] for f in folds]
         summary[name] = {"mean": float(np.mean(values)), "std": float(np.std(values, ddof=1)) if len(values) > 1 else 0.0}
-
-    return {"folds": folds, "summary": summary}
+    return summary
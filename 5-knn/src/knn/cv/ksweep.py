@@ -0,0 +1,68 @@
+from __future__ import annotations
+import numpy as np
+from typing import Callable, Sequence, Union
+
+from ..model import KNNClassifier
+from ..preprocessing import StandardScaler
+from .cross_validate import Metrics, _score
+
+Array = np.ndarray
+
+def k_sweep(
+    X: Array,
+    y: Array,
+    splitter,
+    ks: Sequence[int],
+    metrics: Metrics,
+    metric: Union[str, Callable] = "l2",
+    scale: bool = True,
+) -> dict:
+    """
+    Cross-validates StandardScaler (if scale) + KNNClassifier for every k in ks
+    at about the cost of one run: each fold ranks the neighbors of its test
+    rows once, up to max(ks), and every k is scored from cumulative label
+    counts over that ranking. Votes follow KNNClassifier (ties -> label seen
+    first in neighbor order), so each column equals a cross_validate run with
+    that k.
+    Returns:
+      {
+        'ks': [...],
+        'folds': [{'idx': i, 'n_train': ..., 'n_test': ..., 'metrics': {k: {...}}}, ...],
+        'summary': {k: {'metric': {'mean': ..., 'std': ...}}, ...}
+      }
+    """
+    ks = sorted({int(k) for k in ks})
+    if not ks or ks[0] < 1:
+        raise ValueError("ks must be a non-empty list of k >= 1")
+    X = np.asarray(X)
+    y = np.asarray(y)
+
+    folds = []
+    for i, (tr_idx, te_idx) in enumerate(splitter.split(X, y)):
+        Xtr, ytr = X[tr_idx], y[tr_idx]
+        Xte, yte = X[te_idx], y[te_idx]
+        if scale:
+            scaler = StandardScaler().fit(Xtr)
+            Xtr, Xte = scaler.transform(Xtr), scaler.transform(Xte)
+        clf = KNNClassifier(k=ks[-1], metric=metric).fit(Xtr, ytr)
+        # encoded labels (index into classes_) of the ranked neighbors
+        y_enc = np.searchsorted(clf.classes_, ytr)
+        labels = y_enc[clf.kneighbors(Xte, return_distance=False)]
+        C = len(clf.classes_)
+        # counts[:, j, c]: votes for class c among the j + 1 nearest neighbors
+        counts = np.cumsum(labels[:, :, None] == np.arange(C), axis=1)
+
+        per_k = {}
+        for k in ks:
+            kk = min(k, labels.shape[1])
+            yhat = clf.classes_[KNNClassifier._vote(labels[:, :kk], C, counts[:, kk - 1])]
+            per_k[k] = _score(metrics, yte, yhat)
+        folds.append({"idx": i, "n_train": int(len(tr_idx)), "n_test": int(len(te_idx)), "metrics": per_k})
+
+    summary: dict[int, dict[str, dict[str, float]]] = {}
+    for k in ks:
+        summary[k] = {}
+        for name in (folds[0]["metrics"][k] if folds else ()):
+            values = [f["metrics"][k][name] for f in folds]
+            summary[k][name] = {"mean": float(np.mean(values)), "std": float(np.std(values, ddof=1)) if len(values) > 1 else 0.0}
+    return {"ks": ks, "folds": folds, "summary": summary}
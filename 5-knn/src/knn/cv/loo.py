@@ -0,0 +1,126 @@
+from __future__ import annotations
+import numpy as np
+from typing import Callable, Optional, Union
+
+from ..distances import get_metric
+from ..model import KNNClassifier
+from ..neighbors import block_rows, exact_block, pairwise_block, select_k, select_k_exact
+from ..preprocessing import StandardScaler
+from .cross_validate import Metrics, _score, _summarize
+
+Array = np.ndarray
+
+LOO_SCALING = ("exact", "global", "none")
+
+# metrics that only depend on x - y, so the per-fold mean cancels out
+_TRANSLATION_INVARIANT = ("l2", "l1")
+
+def _fold_scales(X: Array, rows: slice) -> tuple[Array, Array]:
+    """
+    Mean and std that StandardScaler would fit on X without row i, for every
+    i in rows: the full-data statistics with one sample removed (Welford
+    downdate), O(d) per fold instead of a refit.
+    """
+    n = len(X)
+    mean = X.mean(axis=0)
+    M2 = ((X - mean) ** 2).sum(axis=0)
+    Xi = X[rows]
+    mean_i = mean + (mean - Xi) / (n - 1)
+    M2_i = np.maximum(M2 - (Xi - mean) * (Xi - mean_i), 0.0)
+    std_i = np.sqrt(M2_i / (n - 1))
+    # constant column once row i is left out (up to downdate rounding)
+    std_i[M2_i <= 1e-12 * M2] = 1.0
+    return mean_i, std_i
+
+def _exact_block(X: Array, rows: slice, spec) -> Array:
+    """
+    Distances from X[rows] to every row of X, each held-out row using the
+    scaler fitted on the other n - 1 rows.
+    """
+    mean_i, std_i = _fold_scales(X, rows)
+    w = 1.0 / std_i
+    Q = X[rows]
+    if spec.name in _TRANSLATION_INVARIANT:
+        # (q - x) / s_i: accumulated one feature at a time (no 3D temporaries)
+        D = np.zeros((len(Q), len(X)), dtype=float)
+        for j in range(X.shape[1]):
+            diff = w[:, j, None] * (Q[:, j, None] - X[None, :, j])
+            D += diff * diff if spec.name == "l2" else np.abs(diff)
+        return np.sqrt(D, out=D) if spec.name == "l2" else D
+    # any other metric: rescale the whole training set once per held-out row
+    D = np.empty((len(Q), len(X)), dtype=float)
+    for r in range(len(Q)):
+        Xs = (X - mean_i[r]) * w[r]
+        D[r] = exact_block(Xs[rows.start + r][None, :], Xs, spec)[0]
+    return D
+
+def knn_leave_one_out(
+    X: Array,
+    y: Array,
+    k: int = 3,
+    metric: Union[str, Callable] = "l2",
+    metrics: Optional[Metrics] = None,
+    scaling: str = "exact",
+    working_memory: Optional[int] = None,
+) -> dict:
+    """
+    Leave-one-out evaluation of StandardScaler + KNNClassifier(k, metric)
+    without refitting a pipeline per sample.
+
+    The (n x n) distance matrix is computed once, block by block (sized to
+    working_memory bytes); the diagonal is masked so no sample is its own
+    neighbor, and each block's held-out neighbors come from one argpartition.
+    Votes use KNNClassifier's rules (ties -> label seen first in neighbor order).
+
+    scaling:
+    - "exact": each held-out row uses the scaler fitted on the other n - 1 rows
+      (its statistics are downdated from the full-data ones). Same model as
+      cross_validate with LeaveOneOut and a scaler pipeline; distances agree
+      up to floating-point rounding (~1e-12 relative), so predictions can only
+      differ where two candidates are tied within that rounding.
+    - "global": one scaler fitted on all n rows (the held-out row leaks into
+      the mean/std). Cheapest; an approximation of per-fold refitting that
+      is close for large n.
+    - "none": no scaling.
+
+    Returns the same {'folds': [...], 'summary': {...}} dict as cross_validate
+    (one fold per sample).
+    """
+    if scaling not in LOO_SCALING:
+        raise ValueError(f"scaling must be one of {LOO_SCALING}")
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    n = len(X)
+    if X.ndim != 2 or n != len(y):
+        raise ValueError("X must be 2D with one label per row")
+    if n < 2:
+        raise ValueError("leave-one-out needs at least 2 samples")
+    spec = get_metric(metric)
+    metrics = metrics or {}
+
+    Xs = StandardScaler().fit(X).transform(X) if scaling == "global" else X
+    clf = KNNClassifier(k=k, metric=spec, algorithm="brute").fit(Xs, y)
+    kk = min(k, n - 1)
+    cache = spec.norm_cache(Xs) if spec.norm_cache is not None else None
+
+    idx = np.empty((n, kk), dtype=np.int64)
+    step = block_rows(n, working_memory)
+    for start in range(0, n, step):
+        rows = slice(start, min(start + step, n))
+        if scaling == "exact":
+            D = _exact_block(X, rows, spec)
+        else:
+            D = pairwise_block(Xs[rows], Xs, spec, cache)
+        D[np.arange(len(D)), np.arange(rows.start, rows.stop)] = np.inf
+        if scaling == "exact":      # _exact_block values are already shape-independent
+            idx[rows] = select_k(D, kk)[0]
+        else:
+            idx[rows] = select_k_exact(D, kk, Xs[rows], Xs, spec, cache, working_memory)[0]
+    y_pred, _ = clf.predict_from_neighbors(idx)
+
+    folds = []
+    for i in range(n):
+        yte, yhat = y[i:i + 1], y_pred[i:i + 1]
+        mvals = _score(metrics, yte, yhat)
+        folds.append({"idx": i, "n_train": n - 1, "n_test": 1, "metrics": mvals})
+    return {"folds": folds, "summary": _summarize(folds)}
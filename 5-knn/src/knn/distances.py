@@ -1,7 +1,11 @@
 from __future__ import annotations
 import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Union
 
 Array = np.ndarray
+Metric = Callable[[Array, Array], float]
+BlockMetric = Callable[..., Array]
 
 def l2(a: Array, b: Array) -> float:
     """Euclidean distance."""
@@ -21,3 +25,142 @@ def cosine(a: Array, b: Array) -> float:
         # define max distance if one vector is zero to avoid NaN
         return 1.0
     return 1.0 - float(np.dot(a, b) / (na * nb))
+
+# ---- block kernels: (queries Q x train X) -> distance matrix ----
+# X_cache: optional per-row data of X precomputed once (see MetricSpec.norm_cache).
+
+def sq_norms(X: Array) -> Array:
+    """Squared L2 norm of each row."""
+    return np.einsum("ij,ij->i", X, X)
+
+def row_norms(X: Array) -> Array:
+    """L2 norm of each row."""
+    return np.linalg.norm(X, axis=1)
+
+def l2_block(Q: Array, X: Array, X_cache: Optional[Array] = None) -> Array:
+    """
+    Euclidean distances via ||q||² + ||x||² - 2 q·x (clipped at 0). Fast, but
+    the matrix product rounds differently depending on the block shape; see
+    l2_exact.
+    """
+    xx = sq_norms(X) if X_cache is None else X_cache
+    sq = sq_norms(Q)[:, None] + xx[None, :] - 2.0 * (Q @ X.T)
+    np.maximum(sq, 0.0, out=sq)
+    return np.sqrt(sq, out=sq)
+
+def l1_block(Q: Array, X: Array, X_cache: Optional[Array] = None) -> Array:
+    """Manhattan distances, accumulated one feature at a time (no 3D temporaries)."""
+    D = np.zeros((len(Q), len(X)), dtype=float)
+    for j in range(Q.shape[1]):
+        D += np.abs(Q[:, j, None] - X[None, :, j])
+    return D
+
+def cosine_block(Q: Array, X: Array, X_cache: Optional[Array] = None) -> Array:
+    """Cosine distances; 1.0 whenever one of the two vectors is zero (as in cosine)."""
+    nq = row_norms(Q)
+    nx = row_norms(X) if X_cache is None else X_cache
+    with np.errstate(divide="ignore", invalid="ignore"):
+        D = 1.0 - (Q @ X.T) / np.outer(nq, nx)
+    D[nq == 0.0, :] = 1.0
+    D[:, nx == 0.0] = 1.0
+    return D
+
+# ---- shape-independent kernels ----
+# exact(A, B): distances of broadcast row pairs A[..., :] vs B[..., :], accumulated
+# one feature at a time, so every value is rounded the same way whatever the array
+# shapes (exact(Q[:, None], X[None]) is a block, exact(Q[rows], X[cols]) pairs).
+# block_error(Q, X, X_cache) bounds |block - exact| for each row of Q.
+
+def _dot_rounding(d: int) -> float:
+    """Generous bound, relative to the squared norms, on two roundings of a length-d dot product."""
+    return 8.0 * (d + 2) * np.finfo(float).eps
+
+def l2_exact(A: Array, B: Array) -> Array:
+    sq = np.zeros(np.broadcast_shapes(A.shape[:-1], B.shape[:-1]))
+    for j in range(A.shape[-1]):
+        diff = A[..., j] - B[..., j]
+        sq += diff * diff
+    return np.sqrt(sq, out=sq)
+
+def l2_block_error(Q: Array, X: Array, X_cache: Optional[Array] = None) -> Array:
+    xx = sq_norms(X) if X_cache is None else X_cache
+    # |sqrt(a) - sqrt(b)| <= sqrt(|a - b|)
+    return np.sqrt(_dot_rounding(Q.shape[1]) * (sq_norms(Q) + xx.max(initial=0.0)))
+
+def cosine_exact(A: Array, B: Array) -> Array:
+    dot = np.zeros(np.broadcast_shapes(A.shape[:-1], B.shape[:-1]))
+    na = np.zeros(A.shape[:-1])
+    nb = np.zeros(B.shape[:-1])
+    for j in range(A.shape[-1]):
+        a, b = A[..., j], B[..., j]
+        dot += a * b
+        na += a * a
+        nb += b * b
+    na, nb = np.sqrt(na), np.sqrt(nb)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        D = 1.0 - dot / (na * nb)
+    return np.where((na == 0.0) | (nb == 0.0), 1.0, D)
+
+def cosine_block_error(Q: Array, X: Array, X_cache: Optional[Array] = None) -> Array:
+    return np.full(len(Q), _dot_rounding(Q.shape[1]))
+
+# ---- metric registry ----
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """
+    A named distance:
+    - scalar: two-vector form, metric(a, b) -> float
+    - block: optional vectorized form, block(Q, X, X_cache=None) -> (len(Q), len(X))
+    - is_metric: satisfies the triangle inequality (metric trees may prune with it);
+      None when unknown, i.e. a plain callable the caller vouches for
+    - norm_cache: optional per-row data of X that block() can reuse across queries
+    - exact / block_error: for block kernels whose rounding depends on the
+      block shape (matrix-product expansions): a shape-independent kernel and
+      a bound on the block's deviation from it. Neighbor selection re-scores
+      the block's candidates near the k-th distance with exact, so results
+      (ties included) do not depend on batching or tree leaves. Leave both
+      None when block already computes every value independently.
+    """
+    name: str
+    scalar: Metric
+    block: Optional[BlockMetric] = None
+    is_metric: Optional[bool] = None
+    norm_cache: Optional[Callable[[Array], Array]] = None
+    exact: Optional[BlockMetric] = None
+    block_error: Optional[BlockMetric] = None
+
+_REGISTRY: Dict[str, MetricSpec] = {}
+
+def register_metric(spec: MetricSpec) -> MetricSpec:
+    """Add (or replace) a named metric."""
+    _REGISTRY[spec.name] = spec
+    return spec
+
+def available_metrics() -> list[str]:
+    return sorted(_REGISTRY)
+
+def get_metric(metric: Union[str, Metric, MetricSpec]) -> MetricSpec:
+    """
+    Resolve a metric name, callable or spec (returned as is). Registered callables (e.g. l2) map to
+    their spec; any other callable gets a scalar-only spec (no block kernel,
+    is_metric unknown).
+    """
+    if isinstance(metric, MetricSpec):
+        return metric
+    if isinstance(metric, str):
+        if metric not in _REGISTRY:
+            raise ValueError(f"Unknown metric '{metric}'. Use one of {available_metrics()}")
+        return _REGISTRY[metric]
+    if not callable(metric):
+        raise TypeError("metric must be a name or a callable(a, b) -> float")
+    for spec in _REGISTRY.values():
+        if spec.scalar is metric:
+            return spec
+    return MetricSpec(name=getattr(metric, "__name__", "custom"), scalar=metric)
+
+register_metric(MetricSpec("l2", l2, l2_block, is_metric=True, norm_cache=sq_norms,
+                           exact=l2_exact, block_error=l2_block_error))
+register_metric(MetricSpec("l1", l1, l1_block, is_metric=True))
+register_metric(MetricSpec("cosine", cosine, cosine_block, is_metric=False, norm_cache=row_norms,
+                           exact=cosine_exact, block_error=cosine_block_error))
@@ -0,0 +1,5 @@
+from .kdtree import KDTree
+from .balltree import BallTree
+from .lsh import LSHIndex, recall_at_k
+
+__all__ = ["KDTree", "BallTree", "LSHIndex", "recall_at_k"]
@@ -0,0 +1,242 @@
+from __future__ import annotations
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Any
+
+from ..distances import MetricSpec
+from ..neighbors import select_k_sparse
+
+Array = np.ndarray
+
+# Slack on pruning bounds: block kernels (e.g. the L2 expansion) round differently
+# from the bound formulas, and a point at exactly the k-th distance must never be
+# pruned, so trees return exactly what brute force returns.
+PRUNE_RTOL = 1e-7
+PRUNE_ATOL = 1e-6
+
+# Queries scan whole subtrees of up to this many rows (or leaves, if larger):
+# one bigger block of distances is cheaper than several Python-level leaf visits.
+SCAN_ROWS = 128
+
+def grow_rows(buf: Array | None, data: Array, extra: int) -> Array:
+    """
+    Buffer holding `data` (its first len(data) rows) with room for `extra` more.
+    Reuses buf when it is large enough, else allocates max(n + extra, 2n) rows,
+    so repeated appends copy O(1) amortized per row.
+    """
+    n = len(data)
+    if buf is not None and len(buf) >= n + extra:
+        return buf
+    new = np.empty((max(n + extra, 2 * n),) + data.shape[1:], dtype=data.dtype)
+    new[:n] = data
+    return new
+
+def as_queries(Q: Array) -> Array:
+    Q = np.asarray(Q, dtype=float)
+    return Q.reshape(1, -1) if Q.ndim == 1 else Q
+
+_EMPTY = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+
+def _kth(rows: Array, d: Array, n_rows: int, k: int) -> Array:
+    """k-th smallest d of each row for entries (rows, d), inf for rows with fewer than k."""
+    by_row = np.argsort(rows, kind="stable")
+    counts = np.bincount(rows, minlength=n_rows)
+    width = int(counts.max(initial=0))
+    if width < k:
+        return np.full(n_rows, np.inf)
+    E = np.full((n_rows, width), np.inf)
+    E[rows[by_row], np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)] = d[by_row]
+    return np.partition(E, k - 1, axis=1)[:, k - 1]
+
+def _by_node(qi: Array, ni: Array):
+    """Yield (node, queries) for the (query qi, node ni) pairs, grouped by node."""
+    order = np.argsort(ni, kind="stable")
+    qi, ni = qi[order], ni[order]
+    starts = np.flatnonzero(np.r_[True, ni[1:] != ni[:-1]])
+    for a, b in zip(starts, np.r_[starts[1:], len(ni)]):
+        yield ni[a], qi[a:b]
+
+class TreeIndex(ABC):
+    """
+    Shared batched search for binary space-partitioning trees.
+
+    Best-first descent, batched over queries. Each query first walks down to
+    the scan unit (a leaf, or a whole subtree of up to SCAN_ROWS rows) it is
+    nearest to, leaving the sibling at every level on its frontier of
+    (node, lower bound) pairs. Then, in rounds, it takes its frontier in bound
+    order up to its next `width` scan units (width grows by half each round):
+    those units are scanned and the internal nodes before them replaced by
+    their children. Pairs whose bound exceeds the query's current k-th
+    distance are pruned at whatever level they sit, so a query only touches
+    the part of the tree near it. Work is batched: one bound computation per
+    round for all frontier pairs, and one block of distances per scan unit
+    for all the queries that reach it. Candidates come from the fast block
+    distances; those near the k-th distance are re-scored with the metric's
+    exact kernel (as in select_k_exact), so neighbors equal kneighbors_batch,
+    ties included.
+    Subclasses provide the node bounds and the leaf block distances.
+    """
+    root: Any
+    X: Array
+    n_distance_evals: int
+    _spec: MetricSpec
+    _layout_cache: Any = None     # cached _layout(); reset whenever the tree changes
+
+    @abstractmethod
+    def _node_bounds(self, nodes: list) -> tuple[Array, ...]:
+        """The nodes' bounding parameters (e.g. boxes, balls) as arrays with one row per node."""
+
+    @abstractmethod
+    def _lower_bounds(self, bounds: tuple[Array, ...], TQ: Array) -> Array:
+        """
+        Lower bound on the distance from each (tree-space) query TQ[i] to any
+        point in the node whose _node_bounds rows are bounds[...][i]. May be
+        negative; the greedy descent takes the child with the smaller bound.
+        """
+
+    @abstractmethod
+    def _leaf_distances(self, Q: Array, TQ: Array, idx: Array) -> Array:
+        """
+        (len(Q), len(idx)) distances to rows idx, like the metric's block kernel:
+        within its block_error of the exact kernel.
+        """
+
+    def _prepare(self, Q: Array, best_i: Array, best_d: Array) -> tuple[Array, Array]:
+        """
+        Hook run before the search; may pre-fill best lists in place with
+        exact distances. Returns (tree-space queries, indices of queries that
+        still need a search).
+        """
+        return Q, np.arange(len(Q))
+
+    def _layout(self) -> tuple[tuple, Array, list]:
+        """
+        The tree down to its scan units, numbered with the root as 0:
+        (_node_bounds of the nodes, children (n_nodes, 2) with -1 below scan
+        units, row indices of each scan unit or None). Scan units are the
+        largest subtrees with <= SCAN_ROWS rows, or leaves.
+        """
+        if self._layout_cache is None:
+            nodes, children, unit_rows = [], [], []
+            def walk(node) -> tuple[int, Array]:
+                at = len(nodes)
+                nodes.append(node)
+                children.append([-1, -1])
+                unit_rows.append(None)
+                if node.idx is not None:
+                    rows = node.idx
+                else:
+                    left, left_rows = walk(node.left)
+                    right, right_rows = walk(node.right)
+                    rows = np.concatenate([left_rows, right_rows])
+                    if len(rows) > SCAN_ROWS:
+                        children[at] = [left, right]
+                        return at, rows
+                    del nodes[at + 1:], children[at + 1:], unit_rows[at + 1:]
+                unit_rows[at] = rows
+                return at, rows
+            walk(self.root)
+            self._layout_cache = (self._node_bounds(nodes), np.array(children, dtype=np.int64), unit_rows)
+        return self._layout_cache
+
+    def _scan(self, Q: Array, TQ: Array, unit_rows: list, qi: Array, ui: Array,
+              keep: Array, k: int, err: Array):
+        """
+        Block distances for the (query qi, scan unit ui) pairs, one block per unit.
+        Returns entries (rows, cols, d) with d <= keep[row] that are also within
+        2 * err[row] of the row's k-th distance in their unit.
+        """
+        if len(qi) == 0:
+            return _EMPTY
+        rows, cols, dist = [], [], []
+        for u, qs in _by_node(qi, ui):
+            idx = unit_rows[u]
+            D = self._leaf_distances(Q[qs], TQ[qs], idx)
+            self.n_distance_evals += D.size
+            cut = keep[qs]
+            if len(idx) > k:
+                # past the unit's own k-th (+ 2 * err) an entry cannot make the final cut
+                cut = np.minimum(cut, np.partition(D, k - 1, axis=1)[:, k - 1] + 2.0 * err[qs])
+            r, c = np.nonzero(D <= cut[:, None])
+            rows.append(qs[r])
+            cols.append(idx[c])
+            dist.append(D[r, c])
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(dist)
+
+    def _expand(self, TQ: Array, bounds: tuple, children: Array, qi: Array, ni: Array):
+        """Frontier pairs (queries, child nodes, lower bounds) below the internal nodes ni."""
+        qi = np.repeat(qi, 2)
+        ni = children[ni].ravel()
+        return qi, ni, self._lower_bounds(tuple(b[ni] for b in bounds), TQ[qi])
+
+    def _search(self, Q: Array, TQ: Array, pre_i: Array, pre_d: Array) -> tuple[Array, Array]:
+        n, (n_q, k) = len(self.X), pre_i.shape
+        spec = self._spec
+        err = spec.block_error(Q, self.X) if spec.exact is not None else np.zeros(n_q)
+        pre = np.nonzero(pre_i < n)
+        rows, cols, d = pre[0], pre_i[pre], pre_d[pre]
+
+        bounds, children, unit_rows = self._layout()
+        # greedy descent: every query walks down to the scan unit it is nearest to,
+        # leaving the sibling at each level on the frontier of (query, node, bound)
+        fq, fn, flb = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        gq, gn = np.arange(n_q), np.zeros(n_q, dtype=np.int64)
+        keep = _kth(rows, d, n_q, k) + 2.0 * err
+        while len(gq):
+            unit = children[gn, 0] < 0
+            r, c, dd = self._scan(Q, TQ, unit_rows, gq[unit], gn[unit], keep, k, err)
+            rows, cols, d = np.r_[rows, r], np.r_[cols, c], np.r_[d, dd]
+            gq, gn = gq[~unit], gn[~unit]
+            eq, en, elb = self._expand(TQ, bounds, children, gq, gn)
+            far = np.argmin(elb.reshape(-1, 2), axis=1) == 0
+            sibling = 2 * np.arange(len(gq)) + far
+            fq, fn, flb = np.r_[fq, eq[sibling]], np.r_[fn, en[sibling]], np.r_[flb, elb[sibling]]
+            gn = en[sibling ^ 1]
+
+        # best-first rounds, pruning pairs that cannot hold a block distance
+        # within cap + 2 * err (every point within cap + 3 * err)
+        width = 1
+        while True:
+            cap = _kth(rows, d, n_q, k)
+            keep = cap + 2.0 * err
+            near = d <= keep[rows]
+            rows, cols, d = rows[near], cols[near], d[near]
+            reach = cap * (1.0 + PRUNE_RTOL) + PRUNE_ATOL + 3.0 * err
+            live = ~(flb > reach[fq])
+            fq, fn, flb = fq[live], fn[live], flb[live]
+            if len(fq) == 0:
+                break
+            order = np.lexsort((flb, fq))
+            fq, fn, flb = fq[order], fn[order], flb[order]
+            # in bound order: the first `width` scan units and the internal nodes before them
+            unit = children[fn, 0] < 0
+            before = np.cumsum(unit) - unit
+            now = before - before[np.searchsorted(fq, fq)] < width
+            qi, ni = fq[now], fn[now]
+            fq, fn, flb = fq[~now], fn[~now], flb[~now]
+
+            unit = children[ni, 0] < 0
+            r, c, dd = self._scan(Q, TQ, unit_rows, qi[unit], ni[unit], keep, k, err)
+            rows, cols, d = np.r_[rows, r], np.r_[cols, c], np.r_[d, dd]
+            eq, en, elb = self._expand(TQ, bounds, children, qi[~unit], ni[~unit])
+            fq, fn, flb = np.r_[fq, eq], np.r_[fn, en], np.r_[flb, elb]
+            width += width // 2 + 1
+
+        # the exact k among the candidates within 2 * err of the k-th
+        near = d <= (_kth(rows, d, n_q, k) + 2.0 * err)[rows]
+        rows, cols, d = rows[near], cols[near], d[near]
+        if spec.exact is not None:
+            d = spec.exact(Q[rows], self.X[cols])
+        return select_k_sparse(rows, cols, d, n_q, k, n)
+
+    def query(self, Q: Array, k: int, return_distance: bool = False):
+        """k nearest training rows for each row of Q, shape (n_query, min(k, n))."""
+        Q = as_queries(Q)
+        kk = min(k, len(self.X))
+        # placeholders lose against any real candidate
+        best_i = np.full((len(Q), kk), len(self.X), dtype=np.int64)
+        best_d = np.full((len(Q), kk), np.inf)
+        TQ, qs = self._prepare(Q, best_i, best_d)
+        if kk > 0 and self.root is not None and len(qs):
+            best_i[qs], best_d[qs] = self._search(Q[qs], TQ[qs], best_i[qs], best_d[qs])
+        return (best_i, best_d) if return_distance else best_i
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+from ..distances import l2, get_metric
+from ..neighbors import pairwise_block
+from ._common import TreeIndex, grow_rows
+
+Array = np.ndarray
+Metric = Union[str, Callable[[Array, Array], float]]
+
+@dataclass
+class _Ball:
+    center: Array                  # in tree space
+    radius: float
+    idx: Optional[Array] = None    # leaf: training row indices
+    left: Optional["_Ball"] = None
+    right: Optional["_Ball"] = None
+
+class BallTree(TreeIndex):
+    """
+    Exact k-NN metric tree: each node is a ball (center, radius) and a subtree is
+    pruned when d(q, center) - radius exceeds the current k-th distance, which is
+    valid for any true metric (triangle inequality).
+
+    - l2, l1 and custom callables: balls live in the metric itself. A custom
+      callable must be a true metric; registered metrics flagged is_metric=False
+      are rejected, use brute force for those.
+    - cosine (not a metric): balls use the angular distance between unit vectors,
+      which is a metric and monotone in cosine distance. Zero vectors (cosine
+      distance 1.0 to everything) are kept outside the tree.
+
+    Neighbors (ordered by (distance, index)) are identical to kneighbors_batch;
+    see TreeIndex for the search. Pays off over brute force for large training
+    sets and query batches (scripts/bench_index.py).
+    """
+    def __init__(self, X: Array, metric: Metric = l2, leaf_size: int = 30):
+        self._spec = get_metric(metric)
+        self._angular = self._spec.name == "cosine"
+        if self._spec.is_metric is False and not self._angular:
+            raise ValueError(f"BallTree needs a true metric; '{self._spec.name}' is not one")
+        if leaf_size < 1:
+            raise ValueError("leaf_size must be >= 1")
+        self.X = np.asarray(X, dtype=float)
+        self.metric = metric
+        self.leaf_size = int(leaf_size)
+        self.n_distance_evals = 0
+
+        self._zero_idx = np.empty(0, dtype=np.int64)
+        self._T_buf = None
+        self._T = self.X
+        live = self._tree_space(0)
+        self.root = self._build(live) if len(live) else None
+
+    def _tree_space(self, start: int) -> Array:
+        """
+        Map rows start: of self.X into tree space (unit vectors for cosine,
+        zero vectors set aside); returns the indices of those that go in the tree.
+        """
+        idx = np.arange(start, len(self.X))
+        if not self._angular:
+            self._T = self.X
+            return idx
+        P = self.X[start:]
+        norms = np.linalg.norm(P, axis=1)
+        zero = norms == 0.0
+        self._zero_idx = np.concatenate([self._zero_idx, idx[zero]])
+        self._T_buf = grow_rows(self._T_buf, self._T[:start], len(P))
+        self._T_buf[start:len(self.X)] = P / np.where(zero, 1.0, norms)[:, None]
+        self._T = self._T_buf[:len(self.X)]
+        return idx[~zero]
+
+    def add(self, X: Array) -> None:
+        """
+        Take X (the old rows followed by new ones) and insert the new rows in
+        place: each goes down to the child with the nearest center, radii on
+        the way are widened to cover it, and leaves that grow past
+        2 * leaf_size are split. No rebuild of the rest of the tree.
+        """
+        old = len(self.X)
+        self._layout_cache = None
+        self.X = np.asarray(X, dtype=float)
+        live = self._tree_space(old)
+        if len(live) == 0:
+            return
+        if self.root is None:
+            self.root = self._build(live)
+            return
+        self._insert(self.root, live)
+
+    def _insert(self, node: _Ball, idx: Array) -> None:
+        pts = self._T[idx]
+        node.radius = max(node.radius, float(self._tree_dist(node.center, pts).max()))
+        if node.idx is not None:
+            node.idx = np.concatenate([node.idx, idx])
+            if len(node.idx) > 2 * self.leaf_size:
+                split = self._build(node.idx)
+                node.center, node.radius, node.idx = split.center, split.radius, split.idx
+                node.left, node.right = split.left, split.right
+            return
+        go_left = self._tree_dist(node.left.center, pts) <= self._tree_dist(node.right.center, pts)
+        if go_left.any():
+            self._insert(node.left, idx[go_left])
+        if not go_left.all():
+            self._insert(node.right, idx[~go_left])
+
+    def _tree_dist(self, c: Array, P: Array) -> Array:
+        """Distance from point c (or from each row of c) to every row of P, in tree space."""
+        if self._angular:
+            return np.arccos(np.clip(np.einsum("ij,ij->i", P, np.broadcast_to(c, P.shape)), -1.0, 1.0))
+        if self._spec.name == "l2":
+            diff = P - c
+            return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        if self._spec.name == "l1":
+            return np.abs(P - c).sum(axis=1)
+        fn = self._spec.scalar
+        return np.array([fn(p, q) for p, q in zip(P, np.broadcast_to(c, P.shape))], dtype=float)
+
+    def _build(self, idx: Array) -> _Ball:
+        pts = self._T[idx]
+        center = pts.mean(axis=0)
+        if self._angular:
+            norm = np.linalg.norm(center)
+            center = center / norm if norm > 0.0 else pts[0]
+        radius = float(self._tree_dist(center, pts).max())
+        node = _Ball(center=center, radius=radius)
+        spread = pts.max(axis=0) - pts.min(axis=0)
+        if len(idx) <= self.leaf_size or not (spread > 0).any():
+            node.idx = idx
+            return node
+        dim = int(np.argmax(spread))
+        mid = len(idx) // 2
+        order = np.argpartition(pts[:, dim], mid)
+        node.left = self._build(idx[order[:mid]])
+        node.right = self._build(idx[order[mid:]])
+        return node
+
+    def _prepare(self, Q: Array, best_i: Array, best_d: Array) -> tuple[Array, Array]:
+        if not self._angular:
+            return Q, np.arange(len(Q))
+        k = best_i.shape[1]
+        qn = np.linalg.norm(Q, axis=1)
+        zero_q = qn == 0.0
+        # cosine() is 1.0 between a zero vector and anything
+        best_i[zero_q] = np.arange(k)
+        best_d[zero_q] = 1.0
+        live = np.nonzero(~zero_q)[0]
+        if len(self._zero_idx):
+            z = min(k, len(self._zero_idx))
+            best_i[live, :z] = self._zero_idx[:z]
+            best_d[live, :z] = 1.0
+        return Q / np.where(zero_q, 1.0, qn)[:, None], live
+
+    def _node_bounds(self, nodes: list) -> tuple[Array, ...]:
+        return np.array([node.center for node in nodes]), np.array([node.radius for node in nodes])
+
+    def _lower_bounds(self, bounds: tuple[Array, ...], TQ: Array) -> Array:
+        # negative inside the ball: queries descend first into the ball they are deepest in
+        center, radius = bounds
+        lb = self._tree_dist(center, TQ) - radius
+        if self._angular:
+            lb = np.minimum(lb, np.pi)
+            return np.sign(lb) * (1.0 - np.cos(lb))
+        return lb
+
+    def _leaf_distances(self, Q: Array, TQ: Array, idx: Array) -> Array:
+        if self._angular:
+            # unit vectors: 1 - cos straight from one product (within cosine's block_error)
+            return 1.0 - TQ @ self._T[idx].T
+        return pairwise_block(Q, self.X[idx], self._spec)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+from ..distances import l2, get_metric
+from ..neighbors import pairwise_block
+from ._common import TreeIndex
+
+Array = np.ndarray
+Metric = Union[str, Callable[[Array, Array], float]]
+
+@dataclass
+class _KDNode:
+    lo: Array                      # bounding box of the points below this node
+    hi: Array
+    idx: Optional[Array] = None    # leaf: training row indices
+    left: Optional["_KDNode"] = None
+    right: Optional["_KDNode"] = None
+
+class KDTree(TreeIndex):
+    """
+    Exact k-NN index for l2 / l1 (axis-aligned bounding boxes, median splits).
+    Subtrees whose box is farther than the current k-th neighbor are pruned.
+    Neighbors are ordered by (distance, index), exactly like kneighbors_batch.
+    """
+    def __init__(self, X: Array, metric: Metric = l2, leaf_size: int = 30):
+        self._spec = get_metric(metric)
+        if self._spec.name not in ("l2", "l1"):
+            raise ValueError("KDTree supports only the l2 and l1 metrics")
+        if leaf_size < 1:
+            raise ValueError("leaf_size must be >= 1")
+        self.X = np.asarray(X, dtype=float)
+        self.metric = metric
+        self.leaf_size = int(leaf_size)
+        self.n_distance_evals = 0
+        self.root = self._build(np.arange(len(self.X))) if len(self.X) else None
+
+    def _build(self, idx: Array) -> _KDNode:
+        pts = self.X[idx]
+        node = _KDNode(lo=pts.min(axis=0), hi=pts.max(axis=0))
+        spread = node.hi - node.lo
+        if len(idx) <= self.leaf_size or not (spread > 0).any():
+            node.idx = idx
+            return node
+        dim = int(np.argmax(spread))
+        mid = len(idx) // 2
+        order = np.argpartition(pts[:, dim], mid)
+        node.left = self._build(idx[order[:mid]])
+        node.right = self._build(idx[order[mid:]])
+        return node
+
+    def add(self, X: Array) -> None:
+        """
+        Take X (the old rows followed by new ones) and insert the new rows in
+        place: each goes down to the child whose box needs the smallest
+        expansion, boxes on the way are widened, and leaves that grow past
+        2 * leaf_size are split. No rebuild of the rest of the tree.
+        """
+        X = np.asarray(X, dtype=float)
+        old = len(self.X)
+        self._layout_cache = None
+        self.X = X
+        new = np.arange(old, len(X))
+        if len(new) == 0:
+            return
+        if self.root is None:
+            self.root = self._build(np.arange(len(X)))
+            return
+        self._insert(self.root, new)
+
+    def _insert(self, node: _KDNode, idx: Array) -> None:
+        pts = self.X[idx]
+        node.lo = np.minimum(node.lo, pts.min(axis=0))
+        node.hi = np.maximum(node.hi, pts.max(axis=0))
+        if node.idx is not None:
+            node.idx = np.concatenate([node.idx, idx])
+            if len(node.idx) > 2 * self.leaf_size:
+                split = self._build(node.idx)
+                node.lo, node.hi, node.idx = split.lo, split.hi, split.idx
+                node.left, node.right = split.left, split.right
+            return
+        def growth(child: _KDNode) -> Array:
+            return (np.maximum(child.lo - pts, 0.0) + np.maximum(pts - child.hi, 0.0)).sum(axis=1)
+        go_left = growth(node.left) <= growth(node.right)
+        if go_left.any():
+            self._insert(node.left, idx[go_left])
+        if not go_left.all():
+            self._insert(node.right, idx[~go_left])
+
+    def _node_bounds(self, nodes: list) -> tuple[Array, ...]:
+        return np.array([node.lo for node in nodes]), np.array([node.hi for node in nodes])
+
+    def _lower_bounds(self, bounds: tuple[Array, ...], TQ: Array) -> Array:
+        lo, hi = bounds
+        gap = np.maximum(np.maximum(lo - TQ, TQ - hi), 0.0)
+        if self._spec.name == "l2":
+            return np.sqrt(np.einsum("ij,ij->i", gap, gap))
+        return gap.sum(axis=1)
+
+    def _leaf_distances(self, Q: Array, TQ: Array, idx: Array) -> Array:
+        return pairwise_block(Q, self.X[idx], self._spec)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+import numpy as np
+from typing import Callable, List, Optional, Union
+
+from ..distances import l2, get_metric
+from ..neighbors import kneighbors_batch, rescore_rows, select_k_sparse
+from ._common import _kth, as_queries
+
+Array = np.ndarray
+Metric = Union[str, Callable[[Array, Array], float]]
+
+class LSHIndex:
+    """
+    Approximate k-NN with multi-table locality-sensitive hashing.
+
+    - cosine: random-hyperplane hashing, one sign bit per hyperplane.
+    - l2: p-stable hashing, h(x) = floor((a·x + b) / bucket_width), a ~ N(0, I).
+      bucket_width=None sets it from the data: BUCKET_SCALE times the spread
+      (standard deviation) of the projections a·x of the training rows.
+
+    Each table hashes a row to n_bits values, folded into one 64-bit key (a
+    rare collision only adds candidates); the table is the rows sorted by key. A query looks up its own bucket in every
+    table plus (n_probes - 1) neighboring buckets (the hash values closest
+    to a boundary are perturbed first), then re-ranks the union of candidates
+    with the exact metric, ordered by (distance, index). Lookups and
+    re-ranking are batched over all queries; queries that collect fewer than
+    k candidates fall back to one exact kneighbors_batch scan together.
+
+    More tables / probes -> higher recall, slower queries (see recall_at_k).
+    """
+    # bucket_width=None: this many standard deviations of the projections
+    BUCKET_SCALE = 1.0
+    # candidate pairs re-ranked at once (bounds the temporaries of a query block)
+    MAX_PAIRS = 1 << 21
+
+    def __init__(
+        self,
+        X: Array,
+        metric: Metric = l2,
+        n_tables: int = 8,
+        n_bits: int = 12,
+        n_probes: int = 8,
+        bucket_width: Optional[float] = None,
+        random_state: int | None = 0,
+    ):
+        self._spec = get_metric(metric)
+        if self._spec.name not in ("l2", "cosine"):
+            raise ValueError("LSHIndex supports only the l2 and cosine metrics")
+        if n_tables < 1 or n_bits < 1 or n_probes < 1:
+            raise ValueError("n_tables, n_bits and n_probes must be >= 1")
+        if bucket_width is not None and bucket_width <= 0:
+            raise ValueError("bucket_width must be > 0")
+        self.X = np.asarray(X, dtype=float)
+        self.metric = metric
+        self.n_tables = int(n_tables)
+        self.n_bits = int(n_bits)
+        self.n_probes = int(n_probes)
+        self.n_distance_evals = 0
+
+        rng = np.random.default_rng(random_state)
+        d = self.X.shape[1]
+        self._A = rng.normal(size=(self.n_tables, d, self.n_bits))
+        if bucket_width is None:
+            spread = np.mean([np.std(self.X @ A, axis=0).mean() for A in self._A]) if len(self.X) else 0.0
+            bucket_width = self.BUCKET_SCALE * spread if spread > 0 else 1.0
+        self.bucket_width = float(bucket_width)
+        self._b = rng.uniform(0.0, self.bucket_width, size=(self.n_tables, self.n_bits))
+        # key = sum of hash values times odd multipliers (mod 2**64), so a probe
+        # that moves value j by +-1 moves the key by +-_mult[j]
+        self._mult = rng.integers(0, 2**63, size=self.n_bits, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._keys = np.empty((self.n_tables, 0), dtype=np.uint64)
+        self._append(self.X)
+
+    def _codes(self, X: Array, t: int) -> tuple[Array, Array]:
+        """Hash codes (n, n_bits) of table t and each value's margin to its nearest boundary."""
+        proj = X @ self._A[t]
+        if self._spec.name == "cosine":
+            return (proj >= 0.0).astype(np.int64), np.abs(proj)
+        z = (proj + self._b[t]) / self.bucket_width
+        h = np.floor(z)
+        frac = z - h
+        # signed margin: negative -> closer to the lower boundary
+        margin = np.where(frac < 0.5, -frac, 1.0 - frac)
+        return h.astype(np.int64), margin
+
+    def _key(self, codes: Array) -> Array:
+        """64-bit key of each row of hash codes."""
+        return (codes.astype(np.uint64) * self._mult).sum(axis=-1, dtype=np.uint64)
+
+    def _append(self, X: Array) -> None:
+        """Hash the rows X (the last rows of self.X) and re-sort every table."""
+        new = np.stack([self._key(self._codes(X, t)[0]) for t in range(self.n_tables)])
+        self._keys = np.concatenate([self._keys, new.reshape(self.n_tables, len(X))], axis=1)
+        self._X_cache = self._spec.norm_cache(self.X)
+        self._order = np.argsort(self._keys, axis=1, kind="stable")
+        self._sorted = np.take_along_axis(self._keys, self._order, axis=1)
+
+    def add(self, X: Array) -> None:
+        """Take X (the old rows followed by new ones) and hash the new rows into the tables."""
+        X = np.asarray(X, dtype=float)
+        old = len(self.X)
+        self.X = X
+        if len(X) > old:
+            self._append(X[old:])
+
+    def _probe_keys(self, codes: Array, margin: Array) -> Array:
+        """(n_q, n_probes) keys: each query's bucket plus single-value perturbations."""
+        keys = self._key(codes)
+        j = np.argsort(np.abs(margin), axis=1, kind="stable")[:, : self.n_probes - 1]
+        if self._spec.name == "cosine":
+            up = np.take_along_axis(codes, j, axis=1) == 0     # flip the bit
+        else:
+            up = np.take_along_axis(margin, j, axis=1) >= 0
+        step = self._mult[j]
+        step = np.where(up, step, np.uint64(0) - step)
+        return np.column_stack([keys, keys[:, None] + step])
+
+    def _lookup(self, Q: Array) -> tuple[Array, Array]:
+        """
+        Probed buckets as ranges [lo, hi) of each table's sorted rows, shape
+        (n_tables, n_q, n_probes) each.
+        """
+        lo, hi = [], []
+        for t in range(self.n_tables):
+            keys = self._probe_keys(*self._codes(Q, t))
+            lo.append(np.searchsorted(self._sorted[t], keys, side="left"))
+            hi.append(np.searchsorted(self._sorted[t], keys, side="right"))
+        return np.stack(lo), np.stack(hi)
+
+    def _candidate_pairs(self, lo: Array, hi: Array) -> tuple[Array, Array]:
+        """(query, row) pairs of the buckets from _lookup, unique and sorted by query then row."""
+        n = len(self.X)
+        n_q, n_probes = lo.shape[1:]
+        qs, rows = [], []
+        for t in range(self.n_tables):
+            first, counts = lo[t].ravel(), (hi[t] - lo[t]).ravel()
+            starts = np.repeat(first - (np.cumsum(counts) - counts), counts)
+            qs.append(np.repeat(np.arange(n_q).repeat(n_probes), counts))
+            rows.append(self._order[t][starts + np.arange(counts.sum())])
+        pair = np.sort(np.concatenate(qs) * n + np.concatenate(rows))
+        pair = pair[np.r_[True, pair[1:] != pair[:-1]][:len(pair)]]
+        return pair // max(n, 1), pair % max(n, 1)
+
+    def candidates(self, Q: Array) -> List[Array]:
+        """Sorted candidate row indices for each query (union over tables and probes)."""
+        Q = as_queries(Q)
+        qi, rows = self._candidate_pairs(*self._lookup(Q))
+        return np.split(rows, np.searchsorted(qi, np.arange(1, len(Q))))
+
+    def _pair_distances(self, Q: Array, qi: Array, rows: Array) -> Array:
+        """
+        Distances of the (query qi, row) pairs by the metric's norm expansion:
+        within its block_error of the exact kernel, in chunks sized to the
+        default working memory.
+        """
+        nq = self._spec.norm_cache(Q)
+        d = np.empty(len(qi))
+        step = rescore_rows(Q.shape[1])
+        for start in range(0, len(qi), step):
+            q, r = qi[start:start + step], rows[start:start + step]
+            dot = np.einsum("ij,ij->i", Q[q], self.X[r])
+            if self._spec.name == "cosine":
+                norms = nq[q] * self._X_cache[r]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    d[start:start + step] = np.where(norms == 0.0, 1.0, 1.0 - dot / norms)
+            else:
+                sq = np.maximum(nq[q] + self._X_cache[r] - 2.0 * dot, 0.0)
+                d[start:start + step] = np.sqrt(sq)
+        return d
+
+    def _rerank(self, Q: Array, lo: Array, hi: Array, k: int) -> tuple[Array, Array, Array]:
+        """
+        k nearest candidates of each query, as select_k_exact selects them:
+        screened with the fast distances, then those within 2 * block_error
+        of the k-th re-scored with the exact kernel. Returns (idx, dist,
+        candidate counts); rows with fewer than k candidates are padded.
+        """
+        n, n_q = len(self.X), len(Q)
+        qi, rows = self._candidate_pairs(lo, hi)
+        d = self._pair_distances(Q, qi, rows)
+        self.n_distance_evals += len(qi)
+        counts = np.bincount(qi, minlength=n_q)
+        err = self._spec.block_error(Q, self.X, self._X_cache)
+        near = d <= (_kth(qi, d, n_q, k) + 2.0 * err)[qi]
+        qi, rows = qi[near], rows[near]
+        d = self._spec.exact(Q[qi], self.X[rows])
+        return select_k_sparse(qi, rows, d, n_q, k, n) + (counts,)
+
+    def query(self, Q: Array, k: int, return_distance: bool = False):
+        """Approximate k nearest training rows for each row of Q, shape (n_query, min(k, n))."""
+        Q = as_queries(Q)
+        n, n_q = len(self.X), len(Q)
+        kk = min(k, n)
+        idx = np.full((n_q, kk), n, dtype=np.int64)
+        dist = np.full((n_q, kk), np.inf)
+        if kk == 0:
+            return (idx, dist) if return_distance else idx
+
+        lo, hi = self._lookup(Q)
+        # re-rank in query blocks of at most MAX_PAIRS candidates (at least one
+        # query), counting candidates before repeats are removed
+        size = (hi - lo).sum(axis=(0, 2))
+        total = np.cumsum(size)
+        short = [np.empty(0, dtype=np.int64)]
+        start = 0
+        while start < n_q:
+            stop = max(start + 1, int(np.searchsorted(
+                total, total[start] - size[start] + self.MAX_PAIRS, side="right")))
+            idx[start:stop], dist[start:stop], counts = self._rerank(
+                Q[start:stop], lo[:, start:stop], hi[:, start:stop], kk)
+            short.append(start + np.nonzero(counts < kk)[0])
+            start = stop
+
+        short = np.concatenate(short)
+        if len(short):  # too few candidates: one exact scan for all of them
+            idx[short], dist[short] = kneighbors_batch(
+                self.X, Q[short], kk, self._spec, return_distance=True, X_cache=self._X_cache)
+            self.n_distance_evals += len(short) * n
+        return (idx, dist) if return_distance else idx
+
+def recall_at_k(approx: Array, exact: Array) -> float:
+    """Mean fraction of the exact k nearest neighbors found by the approximate search."""
+    approx = np.asarray(approx)
+    exact = np.asarray(exact)
+    if approx.shape != exact.shape:
+        raise ValueError("approx and exact must have the same shape")
+    if exact.size == 0:
+        return 1.0
+    hits = [len(np.intersect1d(a, e)) for a, e in zip(approx, exact)]
+    return float(np.sum(hits) / exact.size)
@@ -4,6 +4,7 @@ from .classification import (
     specificity,
     balanced_accuracy,
     per_class_sensitivity_specificity,
+    classification_metrics,
 )
 
 __all__ = [
@@ -12,4 +13,5 @@ __all__ = [
     "specificity",
     "balanced_accuracy",
     "per_class_sensitivity_specificity",
+    "classification_metrics",
 ]
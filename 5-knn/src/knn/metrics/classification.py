@@ -19,17 +19,26 @@ def _per_class_tp_fp_fn_tn(M: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.nd
     TN = total - TP - FP - FN
     return TP, FP, FN, TN
 
+def _matrix(y_true, y_pred, labels, cm) -> tuple[np.ndarray, np.ndarray]:
+    """(matrix, labels) from cm when given (labels default to 0..L-1), else built once."""
+    if cm is None:
+        return confusion_matrix(y_true, y_pred, labels)
+    cm = np.asarray(cm)
+    return cm, (np.arange(len(cm)) if labels is None else np.asarray(labels))
+
 def per_class_sensitivity_specificity(
-    y_true: np.ndarray,
-    y_pred: np.ndarray,
-    labels: np.ndarray | None = None
+    y_true: np.ndarray | None,
+    y_pred: np.ndarray | None,
+    labels: np.ndarray | None = None,
+    cm: np.ndarray | None = None,
 ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Returns (recall_per_class, specificity_per_class, labels_used)
     Sensitivity/Recall_c = TP_c / (TP_c + FN_c)
     Specificity_c       = TN_c / (TN_c + FP_c)
+    cm: precomputed confusion matrix (y_true/y_pred are then ignored).
     """
-    M, labs = confusion_matrix(y_true, y_pred, labels)
+    M, labs = _matrix(y_true, y_pred, labels, cm)
     TP, FP, FN, TN = _per_class_tp_fp_fn_tn(M)
 
     with np.errstate(divide="ignore", invalid="ignore"):
@@ -39,44 +48,48 @@ def per_class_sensitivity_specificity(
     return recall, spec, labs
 
 def sensitivity(
-    y_true: np.ndarray,
-    y_pred: np.ndarray,
+    y_true: np.ndarray | None,
+    y_pred: np.ndarray | None,
     labels: np.ndarray | None = None,
     average: str = "macro",
-    pos_label=None
+    pos_label=None,
+    cm: np.ndarray | None = None,
 ) -> float | np.ndarray:
     """
     average: "macro" | "micro" | "none"
     For binary with pos_label set and average="none", returns per-class recalls in label order.
+    cm: precomputed confusion matrix (y_true/y_pred are then ignored).
     """
-    rec, _, labs = per_class_sensitivity_specificity(y_true, y_pred, labels)
+    M, labels = _matrix(y_true, y_pred, labels, cm)
+    rec, _, labs = per_class_sensitivity_specificity(None, None, labels, cm=M)
     if average == "none":
         return rec
     if average == "macro":
         return float(np.mean(rec)) if len(rec) else 0.0
     if average == "micro":
         # micro recall == global accuracy of positives (same as overall recall across classes)
-        M, _ = confusion_matrix(y_true, y_pred, labels)
         TP = np.diag(M).sum()
         FN = (M.sum(axis=1) - np.diag(M)).sum()
         return float(TP / (TP + FN)) if (TP + FN) > 0 else 0.0
     raise ValueError("average must be one of {'macro','micro','none'}")
 
 def specificity(
-    y_true: np.ndarray,
-    y_pred: np.ndarray,
+    y_true: np.ndarray | None,
+    y_pred: np.ndarray | None,
     labels: np.ndarray | None = None,
     average: str = "macro",
-    pos_label=None
+    pos_label=None,
+    cm: np.ndarray | None = None,
 ) -> float | np.ndarray:
-    spec = per_class_sensitivity_specificity(y_true, y_pred, labels)[1]
+    """cm: precomputed confusion matrix (y_true/y_pred are then ignored)."""
+    M, labels = _matrix(y_true, y_pred, labels, cm)
+    spec = per_class_sensitivity_specificity(None, None, labels, cm=M)[1]
     if average == "none":
         return spec
     if average == "macro":
         return float(np.mean(spec)) if len(spec) else 0.0
     if average == "micro":
         # micro specificity is less standard; compute TN / (TN+FP) aggregated
-        M, _ = confusion_matrix(y_true, y_pred, labels)
         TP = np.diag(M).sum()
         FP = (M.sum(axis=0) - np.diag(M)).sum()
         FN = (M.sum(axis=1) - np.diag(M)).sum()
@@ -86,12 +99,34 @@ def specificity(
     raise ValueError("average must be one of {'macro','micro','none'}")
 
 def balanced_accuracy(
-    y_true: np.ndarray,
-    y_pred: np.ndarray,
-    labels: np.ndarray | None = None
+    y_true: np.ndarray | None,
+    y_pred: np.ndarray | None,
+    labels: np.ndarray | None = None,
+    cm: np.ndarray | None = None,
 ) -> float:
     """
     Multiclass balanced accuracy (scikit-learn style): macro-average recall.
     """
-    rec = sensitivity(y_true, y_pred, labels=labels, average="none")
+    rec = sensitivity(y_true, y_pred, labels=labels, average="none", cm=cm)
     return float(np.mean(rec)) if len(rec) else 0.0
+
+def classification_metrics(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    labels: np.ndarray | None = None,
+    cm: np.ndarray | None = None,
+) -> dict[str, float]:
+    """
+    All summary metrics from a single confusion matrix (built once, or cm):
+    macro/micro sensitivity and specificity, balanced accuracy and accuracy.
+    """
+    M, labels = _matrix(y_true, y_pred, labels, cm)
+    total = M.sum()
+    return {
+        "macro_sensitivity": sensitivity(None, None, labels, average="macro", cm=M),
+        "micro_sensitivity": sensitivity(None, None, labels, average="micro", cm=M),
+        "macro_specificity": specificity(None, None, labels, average="macro", cm=M),
+        "micro_specificity": specificity(None, None, labels, average="micro", cm=M),
+        "balanced_accuracy": balanced_accuracy(None, None, labels, cm=M),
+        "accuracy": float(np.trace(M) / total) if total > 0 else 0.0,
+    }
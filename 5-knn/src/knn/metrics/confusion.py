@@ -2,6 +2,15 @@ from __future__ import annotations
 import numpy as np
 from typing import Tuple
 
+def _encode(y: np.ndarray, labels: np.ndarray, sorter: np.ndarray, name: str) -> np.ndarray:
+    """Index of every value of y in labels (any order), via binary search."""
+    pos = np.searchsorted(labels, y, sorter=sorter)
+    pos[pos == len(labels)] = 0
+    idx = sorter[pos] if len(labels) else pos
+    if len(y) and (len(labels) == 0 or not np.array_equal(labels[idx], y)):
+        raise ValueError(f"{name} contains labels that are not in labels")
+    return idx
+
 def confusion_matrix(
     y_true: np.ndarray,
     y_pred: np.ndarray,
@@ -9,14 +18,19 @@ def confusion_matrix(
 ) -> tuple[np.ndarray, np.ndarray]:
     """
     Rows = true, Cols = pred. Returns (matrix, labels_used)
+    Built in one vectorized pass: labels are encoded with np.searchsorted and
+    the (true, pred) index pairs counted with np.bincount.
     """
     y_true = np.asarray(y_true)
     y_pred = np.asarray(y_pred)
+    if len(y_true) != len(y_pred):
+        raise ValueError("y_true and y_pred must have the same length")
     if labels is None:
         labels = np.unique(np.concatenate([y_true, y_pred]))
+    labels = np.asarray(labels)
     L = len(labels)
-    lab2idx = {lab: i for i, lab in enumerate(labels)}
-    M = np.zeros((L, L), dtype=int)
-    for t, p in zip(y_true, y_pred):
-        M[lab2idx[t], lab2idx[p]] += 1
+    sorter = np.argsort(labels, kind="stable")
+    t = _encode(y_true, labels, sorter, "y_true")
+    p = _encode(y_pred, labels, sorter, "y_pred")
+    M = np.bincount(t * L + p, minlength=L * L).reshape(L, L)
     return M, labels
@@ -1,34 +1,68 @@
 from __future__ import annotations
 import numpy as np
-from typing import Callable, Optional, Iterable
-from collections import Counter
+from typing import Callable, Optional, Iterable, Union
 
-from .neighbors import kneighbors
-from .distances import l2
+from .neighbors import block_rows, kneighbors_batch
+from .distances import l2, get_metric
+from .index import KDTree, BallTree, LSHIndex
+from .index._common import grow_rows
 
 Array = np.ndarray
-Metric = Callable[[Array, Array], float]
+Metric = Union[str, Callable[[Array, Array], float]]
 
 class NotFittedError(RuntimeError):
     ...
 
+ALGORITHMS = ("auto", "brute", "kd_tree", "ball_tree", "lsh")
+
+# "auto" picks the KD-tree only where it beats vectorized brute force:
+# very low-dimensional data and a large training set (see scripts/bench_index.py).
+AUTO_KD_MAX_FEATURES = 4
+AUTO_KD_MIN_SAMPLES = 50_000
+
 class KNNClassifier:
     """
     From-scratch KNN classifier.
     - Stores training data (lazy model).
-    - Pluggable distance metric.
+    - Pluggable distance metric: a registered name ("l2", "l1", "cosine", see
+      register_metric) or a callable(a, b) -> float.
     - Deterministic tie-breaking via neighbor index order.
+    - algorithm: "brute" scans all rows; "kd_tree" (l2/l1) and "ball_tree"
+      (l2/l1/cosine or any callable that is a true metric) prune subtrees;
+      "auto" chooses. All give identical neighbors.
+    - algorithm="lsh" (l2/cosine) is approximate: hashed candidates re-ranked
+      exactly; index_params (n_tables, n_bits, n_probes, bucket_width,
+      random_state) tune the speed/recall trade-off.
+    - add_samples / partial_fit append training rows in place (amortized
+      growth buffer, incremental index update) instead of refitting.
     """
-    def __init__(self, k: int = 3, metric: Metric = l2):
+    def __init__(
+        self,
+        k: int = 3,
+        metric: Metric = l2,
+        algorithm: str = "auto",
+        leaf_size: int = 30,
+        index_params: Optional[dict] = None,
+    ):
         if k < 1:
             raise ValueError("k must be >= 1")
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"algorithm must be one of {ALGORITHMS}")
         self.k = int(k)
         self.metric = metric
+        self._spec = get_metric(metric)
+        self.algorithm = algorithm
+        self.leaf_size = int(leaf_size)
+        self.index_params = dict(index_params or {})
 
         self._X: Optional[Array] = None
         self._y: Optional[Array] = None
         self._classes: Optional[Array] = None
         self._class_to_idx: Optional[dict] = None
+        self._X_cache: Optional[Array] = None
+        self._index = None
+        # growth buffers behind _X, _y and _X_cache once rows are appended
+        self._bufs: Optional[dict] = None
 
     def fit(self, X: Array, y: Iterable) -> "KNNClassifier":
         X = np.asarray(X, dtype=float)
@@ -42,48 +76,246 @@ class KNNClassifier:
         classes = np.unique(y)
         class_to_idx = {c: i for i, c in enumerate(classes)}
         y_idx = np.vectorize(class_to_idx.get)(y)
+        return self._set_training(X, y_idx, classes)
 
+    def _set_training(self, X: Array, y_idx: Array, classes: Array) -> "KNNClassifier":
+        """Install encoded training data (y_idx indexes classes) and build the search structures."""
         self._X = X
         self._y = y_idx
         self._classes = classes
-        self._class_to_idx = class_to_idx
+        self._class_to_idx = {c: i for i, c in enumerate(classes)}
+        self._index = self._build_index(X)
+        self._X_cache = None
+        self._bufs = None
+        if self._index is None and self._spec.norm_cache is not None:
+            self._X_cache = self._spec.norm_cache(X)
         return self
 
+    def partial_fit(self, X: Array, y: Iterable) -> "KNNClassifier":
+        """fit on the first call, add_samples afterwards."""
+        if self._X is None:
+            return self.fit(X, y)
+        return self.add_samples(X, y)
+
+    def add_samples(self, X: Array, y: Iterable) -> "KNNClassifier":
+        """
+        Append training rows to a fitted model without refitting.
+
+        Rows go into buffers that double in capacity when full, so a stream of
+        small appends copies each row O(1) times. Unseen labels are appended to
+        classes_ in first-seen order (existing codes stay valid, so classes_ is
+        then no longer sorted; predict_proba columns follow classes_). A tree
+        or LSH index is updated in place, not rebuilt; the algorithm chosen by
+        "auto" at fit time is kept.
+        """
+        self._check_fitted()
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != self._X.shape[1]:
+            raise ValueError(f"X must be 2D with {self._X.shape[1]} features. Got shape={X.shape}")
+        if len(X) != len(y):
+            raise ValueError("X and y must have same number of samples")
+        if len(X) == 0:
+            return self
+
+        new = [c for c in dict.fromkeys(y.tolist()) if c not in self._class_to_idx]
+        if new:
+            self._classes = np.concatenate([self._classes, np.asarray(new)])
+            self._class_to_idx = {c: i for i, c in enumerate(self._classes)}
+        y_idx = np.array([self._class_to_idx[c] for c in y.tolist()], dtype=np.int64)
+
+        n, m = len(self._X), len(X)
+        if self._bufs is None:
+            # the fitted arrays may be the caller's (or a read-only memmap): never write into them
+            self._bufs = {}
+        parts = {"X": (self._X, X), "y": (self._y, y_idx)}
+        if self._X_cache is not None:
+            parts["cache"] = (self._X_cache, self._spec.norm_cache(X))
+        for key, (old, rows) in parts.items():
+            buf = grow_rows(self._bufs.get(key), old, m)
+            buf[n:n + m] = rows
+            self._bufs[key] = buf
+        self._X = self._bufs["X"][:n + m]
+        self._y = self._bufs["y"][:n + m]
+        if self._X_cache is not None:
+            self._X_cache = self._bufs["cache"][:n + m]
+        if self._index is not None:
+            self._index.add(self._X)
+        return self
+
+    def _resolve_algorithm(self, X: Array) -> str:
+        if self.algorithm != "auto":
+            return self.algorithm
+        if self._spec.name in ("l2", "l1") and X.shape[1] <= AUTO_KD_MAX_FEATURES \
+                and len(X) >= AUTO_KD_MIN_SAMPLES:
+            return "kd_tree"
+        return "brute"
+
+    def _build_index(self, X: Array):
+        algorithm = self._resolve_algorithm(X)
+        if algorithm == "kd_tree":
+            return KDTree(X, metric=self.metric, leaf_size=self.leaf_size)
+        if algorithm == "ball_tree":
+            return BallTree(X, metric=self.metric, leaf_size=self.leaf_size)
+        if algorithm == "lsh":
+            return LSHIndex(X, metric=self.metric, **self.index_params)
+        return None
+
     def _check_fitted(self):
         if self._X is None or self._y is None:
             raise NotFittedError("KNNClassifier is not fitted. Call fit(X, y) first.")
 
-    def _predict_one_idx(self, x: Array) -> int:
-        self._check_fitted()
-        idxs = kneighbors(self._X, x, self.k, self.metric)
-        labels = self._y[idxs]
-        # majority vote
-        return Counter(labels).most_common(1)[0][0]
+    @staticmethod
+    def _as_queries(X: Array) -> Array:
+        """2D view of X; a memmap stays a memmap (chunks are converted one at a time)."""
+        if not isinstance(X, np.ndarray):
+            X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2:
+            raise ValueError("X must be 2D (n_samples, n_features)")
+        return X
 
-    def predict(self, X: Array) -> Array:
-        self._check_fitted()
+    def _batches(self, n: int, batch_size: Optional[int], working_memory: Optional[int]):
+        """Query row slices: batch_size rows each, or sized to working_memory bytes."""
+        if batch_size is None:
+            batch_size = block_rows(len(self._X), working_memory)
+        elif batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        for start in range(0, n, batch_size):
+            yield slice(start, min(start + batch_size, n))
+
+    def _search(self, X: Array, return_distance: bool = False):
+        """k nearest training rows of one batch of queries, nearest first."""
         X = np.asarray(X, dtype=float)
         if X.ndim == 1:
             X = X.reshape(1, -1)
-        y_idx = np.array([self._predict_one_idx(row) for row in X], dtype=int)
+        if self._index is not None:
+            return self._index.query(X, self.k, return_distance=return_distance)
+        # callers hand in one batch at a time: compute it as a single block
+        return kneighbors_batch(self._X, X, self.k, self._spec, block_size=max(1, len(X)),
+                                return_distance=return_distance, X_cache=self._X_cache)
+
+    def _neighbor_labels(self, X: Array) -> Array:
+        """Encoded labels of the k nearest training rows, shape (n, k), nearest first."""
+        return self._y[self._search(X)]
+
+    @staticmethod
+    def _counts(labels: Array, n_classes: int) -> Array:
+        """Votes per class for each row of neighbor labels, shape (n, n_classes)."""
+        counts = np.zeros((len(labels), n_classes), dtype=int)
+        np.add.at(counts, (np.arange(len(labels))[:, None], labels), 1)
+        return counts
+
+    @staticmethod
+    def _vote(labels: Array, n_classes: int, counts: Optional[Array] = None) -> Array:
+        """
+        Majority vote per row. Ties between labels go to the one seen first in
+        neighbor order (same as Counter(labels).most_common(1)).
+        """
+        if counts is None:
+            counts = KNNClassifier._counts(labels, n_classes)
+        at = np.take_along_axis(counts, labels, axis=1)
+        first = np.argmax(at == counts.max(axis=1, keepdims=True), axis=1)
+        return labels[np.arange(len(labels)), first]
+
+    def kneighbors(
+        self,
+        X: Array,
+        return_distance: bool = True,
+        batch_size: Optional[int] = None,
+        working_memory: Optional[int] = None,
+    ):
+        """
+        Indices (into the training set) of the k nearest neighbors of each row
+        of X, shape (n, k), ordered by (distance, index); with return_distance
+        returns (indices, distances). Chunked like predict(). Pass the indices
+        to predict_from_neighbors() to reuse one search for labels and
+        probabilities.
+        """
+        self._check_fitted()
+        X = self._as_queries(X)
+        kk = min(self.k, len(self._X))
+        idx = np.empty((len(X), kk), dtype=np.int64)
+        dist = np.empty((len(X), kk), dtype=float) if return_distance else None
+        for sl in self._batches(len(X), batch_size, working_memory):
+            if return_distance:
+                idx[sl], dist[sl] = self._search(X[sl], return_distance=True)
+            else:
+                idx[sl] = self._search(X[sl])
+        return (idx, dist) if return_distance else idx
+
+    def predict_from_neighbors(self, neighbors: Array) -> tuple[Array, Array]:
+        """
+        (labels, probabilities) from precomputed neighbor indices, as returned
+        by kneighbors(). Same results as predict() and predict_proba().
+        """
+        self._check_fitted()
+        labels = self._y[np.asarray(neighbors)]
+        counts = self._counts(labels, len(self._classes))
+        y_idx = self._vote(labels, len(self._classes), counts)
+        return self._classes[y_idx], counts / self.k
+
+    def predict_with_proba(
+        self,
+        X: Array,
+        batch_size: Optional[int] = None,
+        working_memory: Optional[int] = None,
+    ) -> tuple[Array, Array]:
+        """
+        predict() and predict_proba() from a single neighbor search, chunked
+        like predict(). Returns (labels, probabilities).
+        """
+        self._check_fitted()
+        X = self._as_queries(X)
+        C = len(self._classes)
+        pred = np.empty(len(X), dtype=self._classes.dtype)
+        proba = np.empty((len(X), C), dtype=float)
+        for sl in self._batches(len(X), batch_size, working_memory):
+            pred[sl], proba[sl] = self.predict_from_neighbors(self._search(X[sl]))
+        return pred, proba
+
+    def predict(
+        self,
+        X: Array,
+        batch_size: Optional[int] = None,
+        working_memory: Optional[int] = None,
+    ) -> Array:
+        """
+        Predicted labels. Queries are processed in chunks (batch_size rows, or
+        sized so one chunk's distances fit in working_memory bytes; default
+        DEFAULT_WORKING_MEMORY) and written into a preallocated output, so peak
+        memory does not grow with len(X). Chunking never changes the result:
+        exact distance ties break by index whatever the chunk size.
+        """
+        self._check_fitted()
+        X = self._as_queries(X)
+        C = len(self._classes)
         # map back to original label dtype
-        return self._classes[y_idx]
+        out = np.empty(len(X), dtype=self._classes.dtype)
+        for sl in self._batches(len(X), batch_size, working_memory):
+            out[sl] = self._classes[self._vote(self._neighbor_labels(X[sl]), C)]
+        return out
 
-    def predict_proba(self, X: Array) -> Array:
+    def predict_proba(
+        self,
+        X: Array,
+        batch_size: Optional[int] = None,
+        working_memory: Optional[int] = None,
+    ) -> Array:
         """
         Returns probabilities per class in self.classes_ order (macro-normalized counts).
+        Chunked like predict().
         """
         self._check_fitted()
-        X = np.asarray(X, dtype=float)
-        if X.ndim == 1:
-            X = X.reshape(1, -1)
-        C = len(self._classes)
-        out = np.zeros((len(X), C), dtype=float)
-        for i, row in enumerate(X):
-            idxs = kneighbors(self._X, row, self.k, self.metric)
-            labels = self._y[idxs]
-            counts = np.bincount(labels, minlength=C)
-            out[i, :] = counts / self.k
+        X = self._as_queries(X)
+        out = np.zeros((len(X), len(self._classes)), dtype=float)
+        for sl in self._batches(len(X), batch_size, working_memory):
+            labels = self._neighbor_labels(X[sl])
+            np.add.at(out[sl], (np.arange(len(labels))[:, None], labels), 1.0)
+        out /= self.k
         return out
 
     @property
@@ -1,18 +1,180 @@
 from __future__ import annotations
 import numpy as np
-from typing import Callable
+from typing import Callable, Optional, Union
+
+from .distances import get_metric
 
 Array = np.ndarray
-Metric = Callable[[Array, Array], float]
+Metric = Union[str, Callable[[Array, Array], float]]
+
+# budget for one block of the (queries x train) distance matrix
+DEFAULT_WORKING_MEMORY = 64 * 1024 * 1024  # bytes
+
+def block_rows(n_train: int, working_memory: Optional[int] = None) -> int:
+    """
+    Query rows per block so that one block of float64 distances and its
+    selection temporaries (~4 arrays of n_train values per row) fit in
+    working_memory bytes (default DEFAULT_WORKING_MEMORY). Always >= 1.
+    """
+    if working_memory is None:
+        working_memory = DEFAULT_WORKING_MEMORY
+    if working_memory <= 0:
+        raise ValueError("working_memory must be > 0")
+    return max(1, int(working_memory) // (8 * max(1, n_train) * 4))
 
 def kneighbors(X_train: Array, x: Array, k: int, metric: Metric) -> np.ndarray:
     """
     Return indices of k nearest neighbors in X_train for single sample x.
     Uses partial sort (argpartition) for O(n) selection, then exact order for ties.
     """
-    dists = np.apply_along_axis(lambda r: metric(r, x), 1, X_train)
+    fn = get_metric(metric).scalar
+    dists = np.apply_along_axis(lambda r: fn(r, x), 1, X_train)
     if k >= len(dists):
         return np.argsort(dists)
     idx_k = np.argpartition(dists, kth=k-1)[:k]
     order = np.lexsort((idx_k, dists[idx_k]))
     return idx_k[order]
+
+def pairwise_block(Q: Array, X_train: Array, metric: Metric, X_cache: Optional[Array] = None) -> Array:
+    """
+    (len(Q), len(X_train)) distance matrix. Dispatches to the registered block
+    kernel when the metric has one, else falls back to per-pair calls.
+    X_cache: the metric's precomputed norm_cache(X_train), if any.
+    """
+    spec = get_metric(metric)
+    if spec.block is not None:
+        return spec.block(Q, X_train, X_cache=X_cache)
+    fn = spec.scalar
+    return np.array([[fn(r, q) for r in X_train] for q in Q], dtype=float).reshape(len(Q), len(X_train))
+
+def exact_block(Q: Array, X_train: Array, metric: Metric) -> Array:
+    """
+    Like pairwise_block, but every value is independent of the block shape
+    (the metric's exact kernel when it has one). For small blocks whose
+    distances are compared across calls, e.g. tree leaves.
+    """
+    spec = get_metric(metric)
+    if spec.exact is not None:
+        return spec.exact(Q[:, None, :], X_train[None, :, :])
+    return pairwise_block(Q, X_train, spec)
+
+def select_k(D: Array, k: int) -> tuple[Array, Array]:
+    """
+    Per row of D, the k smallest entries ordered by (distance, column index).
+    Partial selection with argpartition semantics in O(n) per row; ties at the
+    k-th distance go to the lowest indices. Returns (indices, distances).
+    """
+    n_rows, n = D.shape
+    if k < n:
+        kth = np.partition(D, k - 1, axis=1)[:, k - 1:k]
+        less = D < kth
+        ties = D == kth
+        need = k - less.sum(axis=1, keepdims=True)
+        keep = less | (ties & (np.cumsum(ties, axis=1) <= need))
+        cols = np.nonzero(keep)[1].reshape(n_rows, k)
+    else:
+        cols = np.broadcast_to(np.arange(n), (n_rows, n))
+    d = np.take_along_axis(D, cols, axis=1)
+    order = np.lexsort((cols, d), axis=-1)
+    return np.take_along_axis(cols, order, axis=1), np.take_along_axis(d, order, axis=1)
+
+def select_k_exact(
+    D: Array, k: int, Q: Array, X_train: Array, metric: Metric, X_cache: Optional[Array] = None,
+    working_memory: Optional[int] = None,
+) -> tuple[Array, Array]:
+    """
+    select_k for D = pairwise_block(Q, X_train, metric), with the selection
+    and its (distance, index) order taken from the metric's exact kernel, so
+    they do not depend on how queries were blocked. Entries of D within twice
+    block_error of the row's k-th smallest are re-scored (the exact k nearest
+    are always among them); the rest are dropped. Entries set to inf stay out.
+    Re-scoring gathers the candidate rows of Q and X_train in chunks sized to
+    working_memory bytes (default DEFAULT_WORKING_MEMORY), merged into a
+    running top-k, so many ties at the k-th distance cannot blow the budget.
+    Metrics without an exact kernel: select_k(D, k).
+    """
+    spec = get_metric(metric)
+    n_rows, n = D.shape
+    if spec.exact is None or k == 0 or n_rows == 0:
+        return select_k(D, k)
+    kth = np.partition(D, k - 1, axis=1)[:, k - 1] if k < n else D.max(axis=1)
+    cutoff = kth + 2.0 * spec.block_error(Q, X_train, X_cache)
+    rows, cols = np.nonzero(D <= cutoff[:, None])
+    step = rescore_rows(Q.shape[1], working_memory)
+    if len(rows) <= step:
+        return select_k_sparse(rows, cols, spec.exact(Q[rows], X_train[cols]), n_rows, k, n)
+
+    best_i = np.full((n_rows, k), n, dtype=np.int64)
+    best_d = np.full((n_rows, k), np.inf)
+    best_r = np.repeat(np.arange(n_rows), k)
+    for start in range(0, len(rows), step):
+        r, c = rows[start:start + step], cols[start:start + step]
+        best_i, best_d = select_k_sparse(
+            np.concatenate([best_r, r]), np.concatenate([best_i.ravel(), c]),
+            np.concatenate([best_d.ravel(), spec.exact(Q[r], X_train[c])]), n_rows, k, n)
+    return best_i, best_d
+
+def rescore_rows(n_features: int, working_memory: Optional[int] = None) -> int:
+    """
+    Entries re-scored per chunk in select_k_exact so the gathered query and
+    train rows (2 x n_features float64 each) and the kernel's temporaries fit
+    in a quarter of working_memory bytes, next to the distance block itself.
+    Always >= 1.
+    """
+    if working_memory is None:
+        working_memory = DEFAULT_WORKING_MEMORY
+    return max(1, int(working_memory) // (4 * 8 * (2 * max(1, n_features) + 4)))
+
+def select_k_sparse(rows: Array, cols: Array, d: Array, n_rows: int, k: int, n: int) -> tuple[Array, Array]:
+    """
+    select_k for a sparse distance matrix given as entries (rows, cols, d) in
+    any order. Rows with fewer than k entries are padded with placeholder
+    index n at distance inf.
+    """
+    by_row = np.argsort(rows, kind="stable")
+    rows, cols, d = rows[by_row], cols[by_row], d[by_row]
+    counts = np.bincount(rows, minlength=n_rows)
+    pos = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    C = np.full((n_rows, max(k, int(counts.max(initial=0)))), n, dtype=np.int64)
+    E = np.full(C.shape, np.inf)
+    C[rows, pos], E[rows, pos] = cols, d
+    order = np.lexsort((C, E), axis=-1)[:, :k]
+    return np.take_along_axis(C, order, axis=1), np.take_along_axis(E, order, axis=1)
+
+def kneighbors_batch(
+    X_train: Array,
+    X_query: Array,
+    k: int,
+    metric: Metric,
+    block_size: Optional[int] = None,
+    return_distance: bool = False,
+    X_cache: Optional[Array] = None,
+    working_memory: Optional[int] = None,
+):
+    """
+    k nearest neighbors in X_train for every row of X_query, shape (n_query, k).
+    Distances are computed block-wise (block_size query rows at a time, sized to
+    working_memory bytes by default); neighbors are ordered by (distance, index),
+    with exact ties broken by the lower index whatever the block size.
+    X_cache: precomputed norm_cache(X_train) of the metric (computed here if None).
+    """
+    spec = get_metric(metric)
+    if X_cache is None and spec.norm_cache is not None:
+        X_cache = spec.norm_cache(X_train)
+    X_query = np.asarray(X_query, dtype=float)
+    if X_query.ndim == 1:
+        X_query = X_query.reshape(1, -1)
+    n_q, n = len(X_query), len(X_train)
+    kk = min(k, n)
+    if block_size is None:
+        block_size = block_rows(n, working_memory)
+
+    idx = np.empty((n_q, kk), dtype=np.int64)
+    dist = np.empty((n_q, kk), dtype=float)
+    for start in range(0, n_q, block_size):
+        stop = min(start + block_size, n_q)
+        Q = X_query[start:stop]
+        D = pairwise_block(Q, X_train, spec, X_cache)
+        idx[start:stop], dist[start:stop] = select_k_exact(
+            D, kk, Q, X_train, spec, X_cache, working_memory)
+    return (idx, dist) if return_distance else idx
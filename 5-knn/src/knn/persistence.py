@@ -0,0 +1,127 @@
+from __future__ import annotations
+import json
+import struct
+import zipfile
+import numpy as np
+from typing import Any, Dict
+
+from .distances import get_metric
+from .model import KNNClassifier
+from .preprocessing import Pipeline, StandardScaler
+
+Array = np.ndarray
+
+FORMAT_VERSION = 1
+
+def _clf_and_scaler(model: Any) -> tuple[KNNClassifier, StandardScaler | None, list[str]]:
+    if isinstance(model, KNNClassifier):
+        return model, None, ["clf"]
+    if isinstance(model, Pipeline):
+        steps = model.steps
+        if len(steps) == 2 and isinstance(steps[0][1], StandardScaler) \
+                and isinstance(steps[1][1], KNNClassifier):
+            return steps[1][1], steps[0][1], [steps[0][0], steps[1][0]]
+        if len(steps) == 1 and isinstance(steps[0][1], KNNClassifier):
+            return steps[0][1], None, [steps[0][0]]
+    raise TypeError("save_model supports a KNNClassifier or Pipeline([StandardScaler, KNNClassifier])")
+
+def save_model(path: str, model: Any) -> None:
+    """
+    Save a fitted KNNClassifier (optionally behind a StandardScaler in a
+    Pipeline) to an uncompressed .npz, so load_model can memory-map the
+    training arrays. The metric is stored by its registered name; models
+    with an unregistered callable metric cannot be saved.
+    """
+    clf, scaler, names = _clf_and_scaler(model)
+    clf._check_fitted()
+    spec = get_metric(clf.metric)
+    try:
+        registered = get_metric(spec.name) is spec
+    except ValueError:
+        registered = False
+    if not registered:
+        raise ValueError(f"metric '{spec.name}' is not registered (see register_metric); cannot save it")
+    if clf._classes.dtype.hasobject:
+        raise ValueError("object-dtype labels cannot be saved; use int or str labels")
+
+    meta = {
+        "format": FORMAT_VERSION,
+        "pipeline": isinstance(model, Pipeline),
+        "steps": names,
+        "k": clf.k,
+        "metric": spec.name,
+        "algorithm": clf.algorithm,
+        "leaf_size": clf.leaf_size,
+        "index_params": clf.index_params,
+    }
+    arrays: Dict[str, Array] = {
+        "meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+        "X": np.ascontiguousarray(clf._X),
+        "y": np.ascontiguousarray(clf._y),
+        "classes": clf._classes,
+    }
+    if scaler is not None:
+        if scaler.mean_ is None:
+            raise ValueError("StandardScaler is not fitted.")
+        arrays.update(scaler_mean=scaler.mean_, scaler_std=scaler.std_,
+                      scaler_M2=scaler.M2_, scaler_n=np.array(scaler.n_samples_seen_))
+    with open(path, "wb") as fh:      # file handle: np.savez would append ".npz" to the name
+        np.savez(fh, **arrays)
+
+def _member_memmap(path: str, zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> Array:
+    """Memory-map one stored (uncompressed) .npy member of a zip archive."""
+    with open(path, "rb") as fh:
+        fh.seek(info.header_offset)
+        local = fh.read(30)
+        if local[:4] != b"PK\x03\x04":
+            raise ValueError(f"bad zip local header for {info.filename}")
+        name_len, extra_len = struct.unpack("<HH", local[26:30])
+        start = info.header_offset + 30 + name_len + extra_len
+        fh.seek(start)
+        version = np.lib.format.read_magic(fh)
+        read_header = {(1, 0): np.lib.format.read_array_header_1_0,
+                       (2, 0): np.lib.format.read_array_header_2_0}.get(version)
+        if read_header is not None:
+            shape, fortran, dtype = read_header(fh)
+            offset = fh.tell()
+    if read_header is None or dtype.hasobject or not shape or 0 in shape:
+        with zf.open(info) as member:       # scalars, empty and exotic arrays: just read them
+            return np.load(member, allow_pickle=False)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran else "C")
+
+def _load_arrays(path: str, mmap: bool) -> Dict[str, Array]:
+    out: Dict[str, Array] = {}
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                out[name] = _member_memmap(path, zf, info)
+            else:
+                with zf.open(info) as fh:
+                    out[name] = np.load(fh, allow_pickle=False)
+    return out
+
+def load_model(path: str, mmap: bool = True) -> Any:
+    """
+    Load a model written by save_model: a Pipeline if it was saved with a
+    scaler, else a KNNClassifier. With mmap the training arrays are mapped
+    read-only from the file (nothing is refit; brute-force search starts
+    immediately, tree/LSH indexes are rebuilt from the mapped arrays).
+    """
+    arrays = _load_arrays(path, mmap)
+    meta = json.loads(bytes(np.asarray(arrays["meta"])).decode())
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"unsupported model format {meta.get('format')!r}")
+
+    clf = KNNClassifier(k=meta["k"], metric=meta["metric"], algorithm=meta["algorithm"],
+                        leaf_size=meta["leaf_size"], index_params=meta["index_params"])
+    clf._set_training(arrays["X"], arrays["y"], np.asarray(arrays["classes"]))
+    if "scaler_mean" not in arrays:
+        return Pipeline([(meta["steps"][0], clf)]) if meta["pipeline"] else clf
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(arrays["scaler_mean"])
+    scaler.std_ = np.asarray(arrays["scaler_std"])
+    scaler.M2_ = np.asarray(arrays["scaler_M2"])
+    scaler.n_samples_seen_ = int(arrays["scaler_n"])
+    return Pipeline([(meta["steps"][0], scaler), (meta["steps"][1], clf)])
@@ -1,5 +1,8 @@
 from __future__ import annotations
+import copy
+import hashlib
 import numpy as np
+from collections import OrderedDict
 from typing import Any, Protocol, List, Tuple
 
 Array = np.ndarray
@@ -9,57 +12,205 @@ class Transformer(Protocol):
     def transform(self, X: Array) -> Array: ...
 
 class StandardScaler:
-    """Zero-mean, unit-variance per feature; guards zero std."""
+    """
+    Zero-mean, unit-variance per feature; guards zero std.
+    Fit at once (fit) or from chunks (partial_fit): running count, mean and
+    sum of squared deviations (M2) are merged per chunk (Chan/Welford update).
+    """
     def __init__(self) -> None:
         self.mean_: Array | None = None
         self.std_: Array | None = None
+        self.n_samples_seen_: int = 0
+        self.M2_: Array | None = None
 
     def fit(self, X: Array, y: Array | None = None) -> "StandardScaler":
         X = np.asarray(X, dtype=float)
         self.mean_ = X.mean(axis=0)
         std = X.std(axis=0, ddof=0)
+        self.n_samples_seen_ = len(X)
+        self.M2_ = std ** 2 * len(X)
+        std[std == 0.0] = 1.0
+        self.std_ = std
+        return self
+
+    def partial_fit(self, X: Array, y: Array | None = None) -> "StandardScaler":
+        """Update the statistics with one more chunk of rows; matches fit on all rows to float tolerance."""
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2:
+            raise ValueError("X must be 2D (n_samples, n_features)")
+        n_b = len(X)
+        if n_b == 0:
+            return self
+        mean_b = X.mean(axis=0)
+        M2_b = ((X - mean_b) ** 2).sum(axis=0)
+        n_a = self.n_samples_seen_
+        if n_a == 0 or self.mean_ is None:
+            mean, M2 = mean_b, M2_b
+        else:
+            if X.shape[1] != len(self.mean_):
+                raise ValueError(f"X has {X.shape[1]} features, scaler was fitted with {len(self.mean_)}")
+            n = n_a + n_b
+            delta = mean_b - self.mean_
+            mean = self.mean_ + delta * (n_b / n)
+            M2 = self.M2_ + M2_b + delta ** 2 * (n_a * n_b / n)
+        self.n_samples_seen_ = n_a + n_b
+        self.mean_, self.M2_ = mean, M2
+        std = np.sqrt(M2 / self.n_samples_seen_)
         std[std == 0.0] = 1.0
         self.std_ = std
         return self
 
-    def transform(self, X: Array) -> Array:
+    def transform(self, X: Array, out: Array | None = None, chunk_size: int | None = None) -> Array:
+        """
+        (X - mean) / std. out: preallocated float array to write into (may be
+        X itself for in-place scaling). chunk_size: rows converted at a time,
+        so a memory-mapped X is never loaded at once.
+        """
         if self.mean_ is None or self.std_ is None:
             raise RuntimeError("StandardScaler is not fitted.")
-        X = np.asarray(X, dtype=float)
-        return (X - self.mean_) / self.std_
+        if out is None and chunk_size is None:
+            X = np.asarray(X, dtype=float)
+            return (X - self.mean_) / self.std_
+        if out is None:
+            out = np.empty(np.shape(X), dtype=float)
+        elif np.shape(out) != np.shape(X):
+            raise ValueError(f"out must have shape {np.shape(X)}. Got {np.shape(out)}")
+        n = len(X)
+        step = n if chunk_size is None else int(chunk_size)
+        if step < 1 and n:
+            raise ValueError("chunk_size must be >= 1")
+        for start in range(0, n, max(step, 1)):
+            sl = slice(start, min(start + step, n))
+            block = np.asarray(X[sl], dtype=float)
+            np.subtract(block, self.mean_, out=out[sl])
+            np.divide(out[sl], self.std_, out=out[sl])
+        return out
+
+def fingerprint(*arrays: Array | None) -> str:
+    """blake2b digest of the shape, dtype and bytes of each array (None allowed)."""
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        if a is None:
+            h.update(b"none")
+            continue
+        a = np.ascontiguousarray(a)
+        h.update(f"{a.shape}|{a.dtype.str}|".encode())
+        if a.dtype.hasobject:
+            h.update(repr(a.tolist()).encode())
+        else:
+            h.update(memoryview(a).cast("B"))
+    return h.hexdigest()
+
+def _chain_key(prev: str, i: int, step: Any) -> str:
+    """Cache key of step i: its output depends on the pipeline input and on steps 0..i."""
+    return hashlib.blake2b(f"{prev}|{i}|{_step_params(step)}".encode(), digest_size=16).hexdigest()
+
+def _step_params(step: Any) -> str:
+    """Constructor-style parameters of a step: public attributes without a trailing '_'."""
+    params = {k: v for k, v in vars(step).items() if not k.startswith("_") and not k.endswith("_")}
+    return f"{type(step).__module__}.{type(step).__qualname__}{sorted(params.items())!r}"
+
+class TransformCache:
+    """
+    LRU memo of fitted transformer steps and their outputs, for Pipeline(memory=...).
+    Keyed by step position, class and parameters plus the input fingerprint, so a
+    step is only refit when something upstream changed. Cached outputs are
+    read-only; fitted steps are deep-copied in and out.
+    """
+    def __init__(self, maxsize: int = 32) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Any, Array]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[Any, Array] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(entry[0]), entry[1]
+
+    def put(self, key: str, step: Any, Xt: Array, X_in: Array | None = None) -> Array:
+        """Store a fitted step and its output (copied if it shares memory with X_in)."""
+        Xt = np.asarray(Xt)
+        if X_in is not None and np.may_share_memory(Xt, X_in):
+            Xt = Xt.copy()
+        Xt.setflags(write=False)
+        self._entries[key] = (copy.deepcopy(step), Xt)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return Xt
+
+    def clear(self) -> None:
+        self._entries.clear()
 
 class Pipeline:
     """
     Minimal pipeline: sequence of (name, step), where last step must implement fit/predict.
     All previous steps must implement fit/transform.
+    memory: a TransformCache (share one across pipelines, e.g. in a search) or
+    its maxsize; fitted transformers and their outputs are then reused when the
+    same steps are fitted on the same data, and only the last step is refit.
     """
-    def __init__(self, steps: List[Tuple[str, Any]]):
+    def __init__(self, steps: List[Tuple[str, Any]], memory: "TransformCache | int | None" = None):
         if not steps:
             raise ValueError("Pipeline requires at least one step.")
-        self.steps = steps
+        self.steps = list(steps)     # fit swaps in cached steps: never mutate the caller's list
+        self.memory = TransformCache(memory) if isinstance(memory, int) else memory
 
     def fit(self, X: Array, y: Array):
         Xt = X
         # fit/transform all but last
-        for name, step in self.steps[:-1]:
-            Xt = step.fit(Xt, y).transform(Xt)
+        if self.memory is not None:
+            key = fingerprint(np.asarray(X), None if y is None else np.asarray(y))
+        for i, (name, step) in enumerate(self.steps[:-1]):
+            if self.memory is None:
+                Xt = step.fit(Xt, y).transform(Xt)
+                continue
+            key = _chain_key(key, i, step)
+            hit = self.memory.get(key)
+            if hit is None:
+                Xt = self.memory.put(key, step, step.fit(Xt, y).transform(Xt), Xt)
+            else:
+                # a hit replaces the step with the cached fitted copy
+                step, Xt = hit
+                self.steps[i] = (name, step)
         # fit last estimator
         last_name, last = self.steps[-1]
         last.fit(Xt, y)
         return self
 
-    def predict(self, X: Array):
+    def predict(self, X: Array, **predict_params):
+        """predict_params (e.g. batch_size) are passed to the last step."""
         Xt = X
         for name, step in self.steps[:-1]:
             Xt = step.transform(Xt)
         _, last = self.steps[-1]
-        return last.predict(Xt)
+        return last.predict(Xt, **predict_params)
 
-    def predict_proba(self, X: Array):
+    def predict_proba(self, X: Array, **predict_params):
         Xt = X
         for name, step in self.steps[:-1]:
             Xt = step.transform(Xt)
         _, last = self.steps[-1]
         if not hasattr(last, "predict_proba"):
             raise AttributeError("Last step does not implement predict_proba.")
-        return last.predict_proba(Xt)
+        return last.predict_proba(Xt, **predict_params)
+
+    def predict_with_proba(self, X: Array, **predict_params):
+        """(labels, probabilities) from the last step's single neighbor search."""
+        Xt = X
+        for name, step in self.steps[:-1]:
+            Xt = step.transform(Xt)
+        _, last = self.steps[-1]
+        if not hasattr(last, "predict_with_proba"):
+            raise AttributeError("Last step does not implement predict_with_proba.")
+        return last.predict_with_proba(Xt, **predict_params)
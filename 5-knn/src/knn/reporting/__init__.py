@@ -1,3 +1,3 @@
-from .tables import format_folds_table, format_summary_table, format_per_class_table
+from .tables import format_folds_table, format_summary_table, format_per_class_table, format_k_sweep_table
 
-__all__ = ["format_folds_table", "format_summary_table", "format_per_class_table"]
+__all__ = ["format_folds_table", "format_summary_table", "format_per_class_table", "format_k_sweep_table"]
@@ -60,3 +60,26 @@ def format_per_class_table(values, labels, title: str) -> str:
     for lab, val in zip(labels, values):
         lines.append(" | ".join([_pad(str(lab), colw[headers[0]]), _pad(f"{val:.4f}", colw["value"])]))
     return "\n".join(lines)
+
+def format_k_sweep_table(res: dict, metric: str) -> str:
+    """
+    Fold x k table of one metric from k_sweep(), followed by mean/std rows.
+    """
+    ks = res["ks"]
+    headers = ["fold"] + [f"k={k}" for k in ks]
+    rows = [[f["idx"]] + [f"{f['metrics'][k][metric]:.4f}" for k in ks] for f in res["folds"]]
+    rows.append(["mean"] + [f"{res['summary'][k][metric]['mean']:.4f}" for k in ks])
+    rows.append(["std"] + [f"{res['summary'][k][metric]['std']:.4f}" for k in ks])
+    colw = {h: max(len(h), 8) for h in headers}
+    for row in rows:
+        for v, h in zip(row, headers):
+            colw[h] = max(colw[h], len(str(v)))
+
+    lines = [metric]
+    lines.append(" | ".join(_pad(h, colw[h]) for h in headers))
+    lines.append("-+-".join("-" * colw[h] for h in headers))
+    for row in rows:
+        if row[0] == "mean":
+            lines.append("-+-".join("-" * colw[h] for h in headers))
+        lines.append(" | ".join(_pad(v, colw[h]) for v, h in zip(row, headers)))
+    return "\n".join(lines)
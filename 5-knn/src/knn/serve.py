@@ -0,0 +1,218 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import signal
+import stat
+import sys
+import time
+import numpy as np
+from typing import Any, List, Optional, Tuple
+
+Array = np.ndarray
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+
+class MicroBatcher:
+    """
+    Gathers concurrent prediction requests into micro-batches: a batch is run
+    once max_batch requests are queued or max_wait_ms after its first request,
+    whichever comes first, through one batched neighbor search
+    (model.predict_with_proba). Per-request latency is recorded for stats().
+    """
+    def __init__(self, model: Any, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+        self.model = model
+        self.max_batch = int(max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.latencies: List[float] = []
+        self.batch_sizes: List[int] = []
+        self._queue: "asyncio.Queue[Tuple[Array, asyncio.Future, float]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Finish the queued requests, then stop the worker."""
+        await self._queue.join()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, features: Array) -> Tuple[Any, List[float]]:
+        """(label, probabilities) of one feature vector."""
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, fut, time.perf_counter()))
+        return await fut
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get_nowait() if timeout <= 0 else \
+                    await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            batch.append(item)
+        return batch
+
+    def _predict(self, rows: List[Array]) -> list:
+        preds, probas = self.model.predict_with_proba(np.vstack(rows))
+        return list(zip(preds.tolist(), probas.tolist()))
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                results = self._predict([b[0] for b in batch])
+            except Exception:
+                # e.g. one request with a wrong feature count: isolate the bad ones
+                results = []
+                for b in batch:
+                    try:
+                        results += self._predict([b[0]])
+                    except Exception as exc:
+                        results.append(exc)
+            done = time.perf_counter()
+            self.batch_sizes.append(len(batch))
+            for (_, fut, t0), res in zip(batch, results):
+                self.latencies.append(done - t0)
+                if not fut.done():
+                    if isinstance(res, Exception):
+                        fut.set_exception(res)
+                    else:
+                        fut.set_result(res)
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        """Request count, batch sizes and latency percentiles (ms)."""
+        if not self.latencies:
+            return {"requests": 0}
+        ms = np.asarray(self.latencies) * 1000.0
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        return {
+            "requests": len(ms),
+            "batches": len(self.batch_sizes),
+            "mean_batch": float(np.mean(self.batch_sizes)),
+            "p50_ms": float(p50), "p90_ms": float(p90), "p99_ms": float(p99),
+            "max_ms": float(ms.max()),
+        }
+
+async def handle_line(batcher: MicroBatcher, line: str) -> str:
+    """
+    One JSON-lines request -> one JSON response line.
+    Request: {"id": ..., "features": [f1, f2, ...]} (or a bare [f1, f2, ...]).
+    Response: {"id": ..., "pred": label, "proba": [...]} or {"id": ..., "error": "..."}.
+    """
+    req_id = None
+    try:
+        req = json.loads(line)
+        if isinstance(req, dict):
+            req_id = req.get("id")
+            req = req["features"]
+        feats = np.asarray(req, dtype=float)
+        if feats.ndim != 1:
+            raise ValueError("features must be a flat list of numbers")
+        pred, proba = await batcher.predict(feats.reshape(1, -1))
+        out = {"id": req_id, "pred": pred, "proba": proba}
+    except Exception as exc:
+        out = {"id": req_id, "error": f"{type(exc).__name__}: {exc}"}
+    return json.dumps(out)
+
+async def _serve_stream(batcher: MicroBatcher, reader, write) -> None:
+    """Read requests until EOF; each is answered as soon as its batch is done."""
+    pending = set()
+
+    async def answer(line: str) -> None:
+        write(await handle_line(batcher, line) + "\n")
+
+    while True:
+        raw = await reader.readline()
+        if not raw:
+            break
+        line = raw.decode().strip()
+        if line:
+            task = asyncio.ensure_future(answer(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+
+class _FileReader:
+    """readline() of a regular file, run in the default executor (pipe transports reject files)."""
+    def __init__(self, fh):
+        self.fh = fh
+
+    async def readline(self) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(None, self.fh.readline)
+
+async def _stdin_reader():
+    """Async line reader of stdin: a pipe transport for pipes, sockets and TTYs, else _FileReader."""
+    mode = os.fstat(sys.stdin.fileno()).st_mode
+    if not (stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode) or stat.S_ISCHR(mode)):
+        return _FileReader(sys.stdin.buffer)
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    return reader
+
+async def serve(
+    model: Any,
+    socket_path: Optional[str] = None,
+    max_batch: int = DEFAULT_MAX_BATCH,
+    max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+) -> dict:
+    """
+    Serve JSON-lines predictions from stdin to stdout, or on a Unix socket
+    (one request per line, one response per line, per connection) until
+    SIGINT/SIGTERM. Returns the latency stats of the session.
+    """
+    batcher = MicroBatcher(model, max_batch, max_wait_ms)
+    batcher.start()
+    try:
+        if socket_path is None:
+            def write(text: str) -> None:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            await _serve_stream(batcher, await _stdin_reader(), write)
+        else:
+            async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+                try:
+                    await _serve_stream(batcher, reader, lambda text: writer.write(text.encode()))
+                    await writer.drain()
+                finally:
+                    writer.close()
+
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, stop.set)
+            server = await asyncio.start_unix_server(client, path=socket_path)
+            try:
+                async with server:
+                    await stop.wait()
+            finally:
+                if os.path.exists(socket_path):
+                    os.unlink(socket_path)
+    finally:
+        await batcher.stop()
+    return batcher.stats()
+
+def format_stats(stats: dict) -> str:
+    if not stats.get("requests"):
+        return "served 0 requests"
+    return (f"served {stats['requests']} requests in {stats['batches']} batches "
+            f"(mean batch {stats['mean_batch']:.1f}); latency ms "
+            f"p50={stats['p50_ms']:.2f} p90={stats['p90_ms']:.2f} "
+            f"p99={stats['p99_ms']:.2f} max={stats['max_ms']:.2f}")
@@ -0,0 +1,28 @@
+import numpy as np
+from knn import KNNClassifier
+from knn.bulk import count_rows, iter_row_chunks, predict_file
+
+def test_predict_file_csv_and_npy(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(50, 3))
+    y = np.array(["a", "b"])[rng.integers(0, 2, 50)]
+    Q = np.round(rng.normal(size=(23, 3)), 3)
+    clf = KNNClassifier(k=3).fit(X, y)
+    pred, proba = clf.predict_with_proba(Q)
+
+    csv_in, npy_in = tmp_path / "rows.csv", tmp_path / "rows.npy"
+    np.savetxt(csv_in, Q, delimiter=",", fmt="%.3f", header="f1,f2,f3")
+    np.save(npy_in, Q)
+    assert count_rows(str(csv_in)) == count_rows(str(npy_in)) == 23
+    assert [len(c) for c in iter_row_chunks(str(csv_in), 10)] == [10, 10, 3]
+
+    out_npy = tmp_path / "preds.npy"
+    n, _ = predict_file(clf, str(csv_in), str(out_npy), chunk_size=7, proba=True)
+    assert n == 23
+    assert (np.load(out_npy) == pred).all()
+    assert np.array_equal(np.load(tmp_path / "preds.proba.npy"), proba)
+
+    out_csv = tmp_path / "preds.csv"
+    predict_file(clf, str(npy_in), str(out_csv), chunk_size=5)
+    lines = out_csv.read_text().splitlines()
+    assert lines[0] == "pred" and lines[1:] == pred.tolist()
@@ -9,3 +9,33 @@ def test_confusion_multiclass():
     assert list(labs) == [0,1,2]
     # diagonal has at least one correct per class
     assert (np.diag(M) >= 1).all()
+
+def test_confusion_matches_pair_loop_and_label_order():
+    rng = np.random.default_rng(0)
+    names = np.array(["cat", "dog", "eel", "fox"])
+    y_true, y_pred = names[rng.integers(0, 4, 500)], names[rng.integers(0, 4, 500)]
+    labels = np.array(["fox", "cat", "eel", "dog"])       # unsorted on purpose
+    M, labs = confusion_matrix(y_true, y_pred, labels)
+    ref = np.zeros((4, 4), dtype=int)
+    pos = {lab: i for i, lab in enumerate(labels)}
+    for t, p in zip(y_true, y_pred):
+        ref[pos[t], pos[p]] += 1
+    assert (M == ref).all() and list(labs) == list(labels)
+    try:
+        confusion_matrix(y_true, y_pred, labels[:3])
+        assert False, "labels missing from `labels` should raise"
+    except ValueError:
+        pass
+
+def test_metrics_from_precomputed_matrix():
+    from knn.metrics import sensitivity, specificity, balanced_accuracy, classification_metrics
+    y_true = np.array([0, 0, 1, 1, 2, 2, 2])
+    y_pred = np.array([0, 1, 1, 2, 2, 0, 2])
+    M, labs = confusion_matrix(y_true, y_pred)
+    for avg in ("macro", "micro"):
+        assert sensitivity(None, None, average=avg, cm=M) == sensitivity(y_true, y_pred, average=avg)
+        assert specificity(None, None, average=avg, cm=M) == specificity(y_true, y_pred, average=avg)
+    res = classification_metrics(y_true, y_pred)
+    assert res["balanced_accuracy"] == balanced_accuracy(y_true, y_pred)
+    assert res == classification_metrics(None, None, cm=M)
+    assert abs(res["accuracy"] - 4 / 7) < 1e-12
@@ -21,3 +21,110 @@ def test_loo_runs_small():
     loo = LeaveOneOut()
     res = cross_validate(pipe_factory, X, y, loo, {"bal_acc": balanced_accuracy})
     assert len(res["folds"]) == len(X)
+
+def test_knn_loo_matches_pipeline_loo():
+    from knn.cv import knn_leave_one_out
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 3)) * [1.0, 10.0, 0.1]
+    y = rng.integers(0, 3, 60)
+    metrics = {"bal_acc": balanced_accuracy}
+    for metric in ("l2", "l1", "cosine"):
+        factory = lambda: Pipeline([("scaler", StandardScaler()),
+                                    ("clf", KNNClassifier(k=5, metric=metric))])
+        ref = cross_validate(factory, X, y, LeaveOneOut(), metrics)
+        fast = knn_leave_one_out(X, y, k=5, metric=metric, metrics=metrics,
+                                 scaling="exact", working_memory=4096)
+        assert [f["metrics"] for f in fast["folds"]] == [f["metrics"] for f in ref["folds"]]
+        assert fast["summary"] == ref["summary"]
+    glob = knn_leave_one_out(X, y, k=5, metrics=metrics, scaling="global")
+    assert len(glob["folds"]) == len(X)
+
+def test_k_sweep_matches_cross_validate_per_k():
+    from knn.cv import k_sweep
+    rng = np.random.default_rng(3)
+    X = rng.integers(0, 5, size=(90, 3)).astype(float)   # distance ties
+    y = rng.integers(0, 3, 90)
+    kf = KFold(n_splits=4, shuffle=True, random_state=1)
+    metrics = {"bal_acc": balanced_accuracy}
+    res = k_sweep(X, y, kf, [7, 1, 4, 100], metrics)
+    assert res["ks"] == [1, 4, 7, 100]
+    for k in res["ks"]:
+        factory = lambda: Pipeline([("scaler", StandardScaler()), ("clf", KNNClassifier(k=k))])
+        ref = cross_validate(factory, X, y, kf, metrics)
+        assert [f["metrics"][k] for f in res["folds"]] == [f["metrics"] for f in ref["folds"]]
+        assert res["summary"][k] == ref["summary"]
+
+def test_cli_metrics_build_one_confusion_matrix_per_fold(monkeypatch):
+    import knn.metrics.classification as cls
+    from knn.cli import METRIC_NAMES, _fold_metrics
+    from knn.cv import k_sweep, knn_leave_one_out
+    from knn.metrics import sensitivity, specificity
+    calls = []
+    build = cls.confusion_matrix
+    monkeypatch.setattr(cls, "confusion_matrix", lambda *a: calls.append(1) or build(*a))
+    rng = np.random.default_rng(4)
+    X = rng.normal(size=(40, 3))
+    y = rng.integers(0, 3, 40)
+    kf = KFold(n_splits=4, shuffle=True, random_state=0)
+    res = cross_validate(pipe_factory, X, y, kf, _fold_metrics)
+    assert len(calls) == 4
+    assert tuple(res["summary"]) == METRIC_NAMES
+    calls.clear()
+    k_sweep(X, y, kf, [1, 3], _fold_metrics)
+    assert len(calls) == 4 * 2
+    calls.clear()
+    knn_leave_one_out(X, y, k=3, metrics=_fold_metrics)
+    assert len(calls) == len(X)
+    # same values as one metric function (and matrix) per name
+    per_name = {"macro_sensitivity": lambda yt, yp: sensitivity(yt, yp, average="macro"),
+                "macro_specificity": lambda yt, yp: specificity(yt, yp, average="macro"),
+                "balanced_accuracy": balanced_accuracy}
+    assert cross_validate(pipe_factory, X, y, kf, per_name) == res
+
+def test_parallel_backends_match_serial():
+    import functools
+    from knn.cli import _make_pipeline
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(120, 4))
+    y = np.array(["a", "b", "c"])[rng.integers(0, 3, 120)]
+    kf = KFold(n_splits=5, shuffle=True, random_state=0)
+    metrics = {"bal_acc": balanced_accuracy}
+    factory = functools.partial(_make_pipeline, 5, "l1")
+    ref = cross_validate(factory, X, y, kf, metrics)
+    for backend in ("thread", "process"):
+        res = cross_validate(factory, X, y, kf, metrics, n_jobs=2, backend=backend)
+        assert res == ref
+
+def test_pipeline_memory_reuses_fitted_transformers():
+    from knn import TransformCache
+
+    class CountingScaler(StandardScaler):
+        fits = 0
+        def fit(self, X, y=None):
+            CountingScaler.fits += 1
+            return super().fit(X, y)
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(50, 3))
+    y = rng.integers(0, 2, 50)
+    kf = KFold(n_splits=5, shuffle=True, random_state=0)
+    cache = TransformCache(maxsize=8)
+    results = {}
+    for k in (1, 3, 5):
+        factory = lambda: Pipeline([("scaler", CountingScaler()),
+                                    ("clf", KNNClassifier(k=k))], memory=cache)
+        results[k] = cross_validate(factory, X, y, kf, {"bal_acc": balanced_accuracy})
+        plain = lambda: Pipeline([("scaler", StandardScaler()), ("clf", KNNClassifier(k=k))])
+        assert results[k] == cross_validate(plain, X, y, kf, {"bal_acc": balanced_accuracy})
+    assert CountingScaler.fits == 5                   # once per fold, not per k
+    assert cache.hits == 10 and len(cache) == 5
+    pipe = factory().fit(X, y)
+    assert not pipe.steps[1][1]._X.flags.writeable     # cached outputs are read-only
+    small = TransformCache(maxsize=2)
+    for seed in range(4):
+        Pipeline([("s", StandardScaler()), ("c", KNNClassifier())], memory=small).fit(X + seed, y)
+    assert len(small) == 2
+    steps = [("s", StandardScaler()), ("c", KNNClassifier())]
+    originals = list(steps)
+    Pipeline(steps, memory=small).fit(X + 3, y)         # a cache hit
+    assert all(a is b for a, b in zip(steps, originals))  # caller's list untouched
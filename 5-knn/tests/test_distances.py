@@ -16,3 +16,42 @@ def test_cosine_bounds():
     c = np.array([1.0, 0.0])
     assert abs(cosine(a, b) - 1.0) < 1e-12   # orthogonal → distance ~ 1
     assert abs(cosine(a, c) - 0.0) < 1e-12   # identical  → distance 0
+
+def test_registry_resolves_names_and_callables():
+    from knn.distances import get_metric, l2_block
+    spec = get_metric("l2")
+    assert spec.scalar is l2 and spec.block is l2_block and spec.is_metric
+    assert get_metric(cosine) is get_metric("cosine")
+    custom = get_metric(lambda a, b: 0.0)
+    assert custom.block is None and custom.is_metric is None
+    try:
+        get_metric("nope")
+        assert False, "unknown name should raise"
+    except ValueError:
+        pass
+
+def test_block_kernels_match_scalars():
+    from knn.distances import get_metric
+    rng = np.random.default_rng(0)
+    Q, X = rng.normal(size=(4, 3)), rng.normal(size=(6, 3))
+    X[2] = 0.0
+    for name in ("l2", "l1", "cosine"):
+        spec = get_metric(name)
+        cache = spec.norm_cache(X) if spec.norm_cache else None
+        ref = np.array([[spec.scalar(x, q) for x in X] for q in Q])
+        assert np.allclose(spec.block(Q, X, X_cache=cache), ref)
+
+def test_register_custom_metric_used_by_classifier():
+    from knn import KNNClassifier
+    from knn.distances import MetricSpec, register_metric, _REGISTRY
+    cheb = lambda a, b: float(np.abs(a - b).max())
+    register_metric(MetricSpec("test_chebyshev", cheb, is_metric=True))
+    try:
+        X = np.array([[0.0, 0.0], [0.0, 3.0], [5.0, 5.0]])
+        clf = KNNClassifier(k=1, metric="test_chebyshev", algorithm="ball_tree").fit(X, [0, 1, 2])
+        assert clf.predict([[0.0, 2.0], [4.0, 4.0]]).tolist() == [1, 2]
+        by_name = KNNClassifier(k=1, metric="cosine").fit(X + 1.0, [0, 1, 2])
+        by_fn = KNNClassifier(k=1, metric=cosine).fit(X + 1.0, [0, 1, 2])
+        assert (by_name.predict(X) == by_fn.predict(X)).all()
+    finally:
+        del _REGISTRY["test_chebyshev"]
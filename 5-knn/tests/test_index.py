@@ -0,0 +1,197 @@
+import numpy as np
+import pytest
+from knn.distances import l1, l2, cosine
+from knn.index import KDTree
+from knn.model import KNNClassifier
+from knn.neighbors import kneighbors_batch
+
+def test_kdtree_matches_brute_with_ties():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 5, size=(300, 2)).astype(float)   # many exact ties
+    Q = rng.integers(0, 5, size=(40, 2)).astype(float)
+    for metric in (l2, l1):
+        tree = KDTree(X, metric=metric, leaf_size=8)
+        assert (tree.query(Q, 7) == kneighbors_batch(X, Q, 7, metric)).all()
+
+def _scaled_rounded(rng, n=200, n_q=50, d=4):
+    from knn.preprocessing import StandardScaler
+    X = np.round(rng.normal(size=(n, d)), 1)
+    Q = np.round(rng.normal(size=(n_q, d)), 1)
+    scaler = StandardScaler().fit(X)
+    return scaler.transform(X), scaler.transform(Q)
+
+def test_kdtree_matches_brute_on_scaled_ties():
+    # non-integer exact ties: leaf blocks and the full block must order them alike
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        X, Q = _scaled_rounded(rng)
+        for metric in ("l2", "l1"):
+            tree = KDTree(X, metric=metric, leaf_size=5)
+            i_t, d_t = tree.query(Q, 5, return_distance=True)
+            i_b, d_b = kneighbors_batch(X, Q, 5, metric, return_distance=True)
+            assert np.array_equal(i_t, i_b) and np.array_equal(d_t, d_b)
+
+def test_kdtree_prunes_low_dim():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(5000, 3))
+    tree = KDTree(X, leaf_size=16)
+    tree.query(rng.normal(size=(20, 3)), 5)
+    assert tree.n_distance_evals < 20 * len(X) / 5
+
+def test_tree_work_per_query_grows_sublinearly():
+    from knn.index import BallTree
+    rng = np.random.default_rng(5)
+    Q = rng.normal(size=(200, 3))
+    for base in (KDTree, BallTree):
+        class Counting(base):
+            n_bounds = 0
+            def _lower_bounds(self, bounds, TQ):
+                self.n_bounds += len(TQ)
+                return super()._lower_bounds(bounds, TQ)
+        work = []
+        for n in (10000, 80000):
+            tree = Counting(rng.normal(size=(n, 3)))
+            tree.query(Q, 5)
+            work.append((tree.n_bounds, tree.n_distance_evals))
+        # 8x the rows: pruning at internal nodes keeps both well below 8x
+        assert work[1][0] < 4 * work[0][0] and work[1][1] < 4 * work[0][1]
+
+def test_kdtree_rejects_cosine():
+    with pytest.raises(ValueError):
+        KDTree(np.zeros((3, 2)), metric=cosine)
+
+def test_classifier_kd_tree_identical_predictions():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(200, 3))
+    y = rng.integers(0, 3, size=200)
+    Q = rng.normal(size=(50, 3))
+    brute = KNNClassifier(k=5, algorithm="brute").fit(X, y)
+    tree = KNNClassifier(k=5, algorithm="kd_tree", leaf_size=10).fit(X, y)
+    assert (brute.predict(Q) == tree.predict(Q)).all()
+    assert np.array_equal(brute.predict_proba(Q), tree.predict_proba(Q))
+
+def test_balltree_matches_brute_all_metrics():
+    from knn.index import BallTree
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(250, 6))
+    X[[4, 17]] = 0.0                       # zero vectors for cosine
+    Q = rng.normal(size=(30, 6))
+    Q[2] = 0.0
+    cheb = lambda a, b: float(np.abs(a - b).max())
+    for metric in (l2, l1, cosine, cheb):
+        tree = BallTree(X, metric=metric, leaf_size=8)
+        assert (tree.query(Q, 6) == kneighbors_batch(X, Q, 6, metric)).all()
+
+def test_balltree_ties_and_pruning():
+    from knn.index import BallTree
+    rng = np.random.default_rng(4)
+    X = rng.integers(0, 4, size=(400, 3)).astype(float)
+    Q = rng.integers(0, 4, size=(25, 3)).astype(float)
+    tree = BallTree(X, metric=l1, leaf_size=10)
+    assert (tree.query(Q, 5) == kneighbors_batch(X, Q, 5, l1)).all()
+    assert tree.n_distance_evals < 25 * len(X)
+
+def test_balltree_matches_brute_on_scaled_ties():
+    from knn.index import BallTree
+    rng = np.random.default_rng(6)
+    for _ in range(20):
+        X, Q = _scaled_rounded(rng)
+        X[::40] = 0.0
+        for metric in ("l2", "cosine"):
+            i_t, d_t = BallTree(X, metric=metric, leaf_size=4).query(Q, 7, return_distance=True)
+            i_b, d_b = kneighbors_batch(X, Q, 7, metric, return_distance=True)
+            assert np.array_equal(i_t, i_b) and np.array_equal(d_t, d_b)
+
+def test_tree_index_hooks_are_abstract():
+    from knn.index._common import TreeIndex
+
+    class NoBounds(TreeIndex):
+        def _leaf_distances(self, Q, TQ, idx):
+            return np.zeros((len(Q), len(idx)))
+
+    with pytest.raises(TypeError):
+        NoBounds()
+
+def test_classifier_ball_tree_cosine():
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(150, 5))
+    y = rng.integers(0, 2, size=150)
+    Q = rng.normal(size=(40, 5))
+    brute = KNNClassifier(k=3, metric=cosine, algorithm="brute").fit(X, y)
+    ball = KNNClassifier(k=3, metric=cosine, algorithm="ball_tree", leaf_size=12).fit(X, y)
+    assert (brute.predict(Q) == ball.predict(Q)).all()
+
+def test_lsh_recall_and_exact_rerank():
+    from knn.index import LSHIndex, recall_at_k
+    rng = np.random.default_rng(6)
+    centers = rng.normal(scale=5.0, size=(10, 8))
+    X = centers[rng.integers(0, 10, 2000)] + rng.normal(size=(2000, 8))
+    Q = centers[rng.integers(0, 10, 50)] + rng.normal(size=(50, 8))
+    for metric in (l2, cosine):
+        exact_i, exact_d = kneighbors_batch(X, Q, 5, metric, return_distance=True)
+        lsh = LSHIndex(X, metric=metric, n_tables=10, n_bits=6, n_probes=8,
+                       bucket_width=8.0, random_state=0)
+        idx, d = lsh.query(Q, 5, return_distance=True)
+        assert recall_at_k(idx, exact_i) >= 0.8
+        assert (np.diff(d, axis=1) >= 0).all()          # re-ranked exactly
+        assert (d >= exact_d - 1e-12).all()
+        assert lsh.n_distance_evals < len(X) * len(Q)
+
+def test_lsh_fallback_and_auto_width():
+    from knn.index import LSHIndex, recall_at_k
+    rng = np.random.default_rng(8)
+    centers = rng.normal(scale=5.0, size=(10, 8))
+    X = centers[rng.integers(0, 10, 3000)] + rng.normal(size=(3000, 8))
+    Q = centers[rng.integers(0, 10, 40)] + rng.normal(size=(40, 8))
+    exact_i, exact_d = kneighbors_batch(X, Q, 5, l2, return_distance=True)
+    # buckets too narrow to hold k rows: every query takes the exact scan
+    lsh = LSHIndex(X, n_bits=16, n_probes=1, bucket_width=1e-3)
+    idx, d = lsh.query(Q, 5, return_distance=True)
+    assert np.array_equal(idx, exact_i) and np.array_equal(d, exact_d)
+    assert lsh.n_distance_evals == len(X) * len(Q) + sum(map(len, lsh.candidates(Q)))
+    # default width follows the spread of the projections
+    lsh = LSHIndex(X)
+    assert lsh.bucket_width > 0
+    assert lsh.bucket_width == pytest.approx(LSHIndex(X * 10).bucket_width / 10)
+    idx = lsh.query(Q, 5)
+    assert recall_at_k(idx, exact_i) >= 0.8
+    assert lsh.n_distance_evals < 0.5 * len(X) * len(Q)
+    # candidates() agrees with the batched lookup
+    for i, cand in enumerate(lsh.candidates(Q)):
+        assert (np.diff(cand) > 0).all()
+        assert set(idx[i]) <= set(cand) or len(cand) < 5
+
+def test_lsh_classifier_params():
+    X = np.array([[0,0],[0,1],[1,0],[10,10],[10,9],[9,10]], dtype=float)
+    y = np.array([0,0,0,1,1,1])
+    clf = KNNClassifier(k=3, algorithm="lsh", index_params={"n_tables": 4, "n_bits": 2}).fit(X, y)
+    assert (clf.predict(np.array([[0.2,0.1],[9.3,9.1]])) == np.array([0,1])).all()
+    with pytest.raises(ValueError):
+        KNNClassifier(metric=l1, algorithm="lsh").fit(X, y)
+
+def test_add_samples_matches_full_fit():
+    rng = np.random.default_rng(7)
+    X = np.round(rng.normal(size=(400, 3)), 1)       # rounded: plenty of ties
+    X[::50] = 0.0                                     # zero rows for cosine
+    y = rng.choice(["a", "b"], size=400)
+    y[350:] = rng.choice(["c", "a"], size=50)         # new label arrives later
+    Q = np.round(rng.normal(size=(60, 3)), 1)
+    cases = [("kd_tree", "l2"), ("kd_tree", "l1"), ("ball_tree", "l2"),
+             ("ball_tree", "cosine"), ("brute", "cosine"), ("brute", "l2")]
+    for algorithm, metric in cases:
+        full = KNNClassifier(k=5, metric=metric, algorithm="brute").fit(X, y)
+        inc = KNNClassifier(k=5, metric=metric, algorithm=algorithm, leaf_size=4)
+        for start in range(0, 400, 37):
+            inc.partial_fit(X[start:start + 37], y[start:start + 37])
+        i_full, d_full = full.kneighbors(Q)
+        i_inc, d_inc = inc.kneighbors(Q)
+        assert np.array_equal(i_full, i_inc), (algorithm, metric)
+        assert np.allclose(d_full, d_inc)
+        assert np.array_equal(full.predict(Q), inc.predict(Q))
+        assert list(inc.classes_) == ["a", "b", "c"]
+
+    lsh = KNNClassifier(k=3, algorithm="lsh", index_params={"random_state": 0}).fit(X[:200], y[:200])
+    lsh.add_samples(X[200:], y[200:])
+    assert len(lsh._X) == 400 and len(lsh._bufs["X"]) >= 400
+    # every training row is found in its own buckets
+    assert np.all(lsh._index.query(X[200:], 1, return_distance=True)[1][:, 0] < 1e-6)
@@ -13,3 +13,91 @@ def test_not_fitted_raises():
     clf = KNNClassifier(k=3)
     with pytest.raises(NotFittedError):
         clf.predict(np.array([[0.0, 0.0]]))
+
+def test_chunked_prediction_matches_unchunked():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 4, size=(200, 3)).astype(float)   # many distance ties
+    y = np.array(["a", "b", "c"])[rng.integers(0, 3, 200)]
+    Q = rng.integers(0, 4, size=(57, 3)).astype(float)
+    clf = KNNClassifier(k=5).fit(X, y)
+    ref, ref_p = clf.predict(Q, batch_size=len(Q)), clf.predict_proba(Q, batch_size=len(Q))
+    for kw in ({"batch_size": 1}, {"batch_size": 10}, {"working_memory": 1}):
+        assert (clf.predict(Q, **kw) == ref).all()
+        assert np.array_equal(clf.predict_proba(Q, **kw), ref_p)
+    with pytest.raises(ValueError):
+        clf.predict(Q, batch_size=0)
+
+def test_chunking_invariant_on_scaled_ties():
+    from knn.preprocessing import StandardScaler
+    rng = np.random.default_rng(3)
+    # rounded then standardized: non-integer exact ties the L2 expansion rounds unevenly
+    X = np.round(rng.normal(size=(300, 4)), 1)
+    Q = np.round(rng.normal(size=(80, 4)), 1)
+    scaler = StandardScaler().fit(X)
+    X, Q = scaler.transform(X), scaler.transform(Q)
+    y = rng.integers(0, 3, 300)
+    for metric in ("l2", "cosine"):
+        clf = KNNClassifier(k=6, metric=metric, algorithm="brute").fit(X, y)
+        ref_i, ref_d = clf.kneighbors(Q)
+        for kw in ({"batch_size": 1}, {"batch_size": 7}, {"working_memory": 1}):
+            idx, dist = clf.kneighbors(Q, **kw)
+            assert np.array_equal(idx, ref_i) and np.array_equal(dist, ref_d)
+            assert np.array_equal(clf.predict_proba(Q, **kw), clf.predict_proba(Q))
+
+def test_single_search_paths_match_predict():
+    rng = np.random.default_rng(1)
+    X = rng.integers(0, 3, size=(80, 2)).astype(float)
+    y = rng.integers(0, 3, 80)
+    Q = rng.integers(0, 3, size=(25, 2)).astype(float)
+    for algorithm in ("brute", "ball_tree"):
+        clf = KNNClassifier(k=4, algorithm=algorithm).fit(X, y)
+        pred, proba = clf.predict_with_proba(Q, batch_size=7)
+        assert (pred == clf.predict(Q)).all()
+        assert np.array_equal(proba, clf.predict_proba(Q))
+        idx, dist = clf.kneighbors(Q)
+        assert idx.shape == dist.shape == (25, 4)
+        assert np.allclose(dist, np.linalg.norm(X[idx] - Q[:, None], axis=2))
+        p2, pr2 = clf.predict_from_neighbors(clf.kneighbors(Q, return_distance=False))
+        assert (p2 == pred).all() and np.array_equal(pr2, proba)
+
+def test_scaler_partial_fit_and_chunked_transform(tmp_path):
+    from knn import StandardScaler
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=1e4, scale=[1.0, 50.0, 0.0], size=(1000, 3))
+    full = StandardScaler().fit(X)
+    part = StandardScaler()
+    for chunk in np.array_split(X, [1, 7, 300, 301, 999]):
+        part.partial_fit(chunk)
+    assert part.n_samples_seen_ == full.n_samples_seen_ == 1000
+    assert np.allclose(part.mean_, full.mean_, rtol=1e-12)
+    assert np.allclose(part.std_, full.std_, rtol=1e-9)
+    assert part.std_[2] == 1.0
+    path = tmp_path / "X.npy"
+    np.save(path, X)
+    Xm = np.load(path, mmap_mode="r")
+    ref = full.transform(X)
+    assert np.array_equal(full.transform(Xm, chunk_size=64), ref)
+    buf = X.copy()
+    assert full.transform(buf, out=buf, chunk_size=100) is buf
+    assert np.array_equal(buf, ref)
+
+def test_save_load_model_roundtrip(tmp_path):
+    from knn import Pipeline, StandardScaler, save_model, load_model
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 3))
+    y = np.array(["a", "b", "c"])[rng.integers(0, 3, 100)]
+    Q = rng.normal(size=(20, 3))
+    pipe = Pipeline([("scaler", StandardScaler()),
+                     ("clf", KNNClassifier(k=4, metric="cosine"))]).fit(X, y)
+    path = str(tmp_path / "model.npz")
+    save_model(path, pipe)
+    loaded = load_model(path)
+    assert isinstance(loaded.steps[1][1]._X, np.memmap)
+    p1, pr1 = pipe.predict_with_proba(Q)
+    p2, pr2 = loaded.predict_with_proba(Q)
+    assert (p1 == p2).all() and np.array_equal(pr1, pr2)
+    clf = KNNClassifier(k=2, algorithm="ball_tree").fit(X, y)
+    save_model(path, clf)
+    assert (load_model(path, mmap=False).predict(Q) == clf.predict(Q)).all()
+    with pytest.raises(ValueError):
+        save_model(path, KNNClassifier(metric=lambda a, b: 0.0).fit(X, y))
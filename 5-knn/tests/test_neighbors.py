@@ -10,3 +10,61 @@ def test_kneighbors_basic():
     assert set(idxs.tolist()) <= {0,1,2}
     assert len(idxs) == 2
 
+
+def test_kneighbors_batch_matches_single():
+    from knn.neighbors import kneighbors_batch
+    from knn.distances import l1, cosine
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(30, 3))
+    Q = rng.normal(size=(7, 3))
+    for metric in (l2, l1, cosine, lambda a, b: float(np.abs(a - b).max())):
+        idx = kneighbors_batch(X, Q, k=4, metric=metric, block_size=3)
+        assert idx.shape == (7, 4)
+        for i, q in enumerate(Q):
+            assert idx[i].tolist() == kneighbors(X, q, k=4, metric=metric).tolist()
+
+def test_kneighbors_batch_ties_by_index():
+    from knn.neighbors import kneighbors_batch
+    X = np.array([[1,0],[0,1],[-1,0],[0,-1],[5,5]], dtype=float)
+    idx, d = kneighbors_batch(X, np.zeros((1, 2)), k=3, metric=l2, return_distance=True)
+    assert idx.tolist() == [[0, 1, 2]]
+    assert np.allclose(d, 1.0)
+
+def _scaled_rounded(seed, trial, n=200, n_q=50, d=4):
+    """Rounded, then standardized data: many exact ties the L2 expansion rounds unevenly."""
+    from knn.preprocessing import StandardScaler
+    rng = np.random.default_rng(seed)
+    for _ in range(trial + 1):
+        X = np.round(rng.normal(size=(n, d)), 1)
+        Q = np.round(rng.normal(size=(n_q, d)), 1)
+    scaler = StandardScaler().fit(X)
+    return scaler.transform(X), scaler.transform(Q)
+
+def test_kneighbors_batch_ties_independent_of_block_size():
+    from knn.neighbors import kneighbors_batch
+    X, Q = _scaled_rounded(0, 18)
+    # query 39 is exactly as far from rows 107 and 148 (differences [-.4, ±.3, .3, -.1])
+    assert kneighbors_batch(X, Q, k=5, metric="l2")[39, :2].tolist() == [107, 148]
+    for metric in ("l2", "cosine"):
+        one, d_one = kneighbors_batch(X, Q, k=5, metric=metric, block_size=1, return_distance=True)
+        full, d_full = kneighbors_batch(X, Q, k=5, metric=metric, return_distance=True)
+        assert np.array_equal(one, full) and np.array_equal(d_one, d_full)
+
+def test_select_k_exact_rescore_stays_in_working_memory():
+    import tracemalloc
+    from knn.neighbors import kneighbors_batch
+    rng = np.random.default_rng(0)
+    # copies of 4 rows: every row is tied at the k-th distance and re-scored
+    X = rng.normal(size=(4, 32))[rng.integers(0, 4, 20000)]
+    Q = rng.normal(size=(20, 32))
+    budget = 4 * 2**20
+    tracemalloc.start()
+    try:
+        idx, d = kneighbors_batch(X, Q, k=5, metric="l2", return_distance=True,
+                                  working_memory=budget)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < budget
+    full, d_full = kneighbors_batch(X, Q, k=5, metric="l2", return_distance=True)
+    assert np.array_equal(idx, full) and np.array_equal(d, d_full)
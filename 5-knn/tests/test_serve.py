@@ -0,0 +1,45 @@
+import asyncio
+import json
+import numpy as np
+from knn import KNNClassifier
+from knn.serve import MicroBatcher, handle_line
+
+def test_micro_batching_matches_predict():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, 3))
+    y = rng.integers(0, 3, 60)
+    Q = rng.normal(size=(40, 3))
+    clf = KNNClassifier(k=3).fit(X, y)
+
+    async def run():
+        batcher = MicroBatcher(clf, max_batch=16, max_wait_ms=50)
+        batcher.start()
+        lines = [json.dumps({"id": i, "features": q.tolist()}) for i, q in enumerate(Q)]
+        lines.append(json.dumps({"id": "bad", "features": [1.0, 2.0]}))
+        out = await asyncio.gather(*(handle_line(batcher, line) for line in lines))
+        await batcher.stop()
+        return [json.loads(o) for o in out], batcher.stats()
+
+    out, stats = asyncio.run(run())
+    pred, proba = clf.predict_with_proba(Q)
+    assert [o["pred"] for o in out[:-1]] == pred.tolist()
+    assert [o["proba"] for o in out[:-1]] == proba.tolist()
+    assert out[-1]["id"] == "bad" and "error" in out[-1]
+    assert stats["requests"] == 41 and stats["batches"] == 3
+
+def test_serve_reads_stdin_from_regular_file(tmp_path, monkeypatch, capsys):
+    # `knn serve < requests.jsonl`: stdin is a file, which pipe transports reject
+    from knn.serve import serve
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(30, 2))
+    y = rng.integers(0, 2, 30)
+    Q = rng.normal(size=(5, 2))
+    clf = KNNClassifier(k=3).fit(X, y)
+    path = tmp_path / "requests.jsonl"
+    path.write_text("".join(json.dumps({"id": i, "features": q.tolist()}) + "\n" for i, q in enumerate(Q)))
+    with open(path) as fh:
+        monkeypatch.setattr("sys.stdin", fh)
+        stats = asyncio.run(serve(clf))
+    out = sorted((json.loads(line) for line in capsys.readouterr().out.splitlines()), key=lambda o: o["id"])
+    assert [o["pred"] for o in out] == clf.predict(Q).tolist()
+    assert stats["requests"] == 5